@@ -0,0 +1,182 @@
+"""Benchmarks clashofclans commands against the mock Clash of Clans API.
+
+Needs Red (and so discord.py and aiohttp) installed, but no token or network:
+
+    python -m benchmarks.bench_commands --invocations 200 --concurrency 20
+
+Every command is invoked with fake contexts and the throughput, latency
+percentiles and number of API requests that reached the server are printed.
+Use ``--cold`` to clear the response cache before every invocation.
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from clashofclans import clashofclans as cog_module
+
+from . import fakes
+from .mock_api import MockClashAPI
+
+CLAN_TAG = "2PP"
+PLAYER_TAGS = [f"2PPM{index:02}" for index in range(6)]
+
+# Commands and the arguments they are invoked with, linked accounts fill in the rest
+SCENARIOS = {
+    "player": (None,),
+    "army": (None,),
+    "clan": (None,),
+    "clandonations": (None,),
+    "clanwar": (None,),
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def make_cog(base_url: str, data_path: Path):
+    # Config and the data folder are the only parts of Red that need a bot
+    cog_module.Config = fakes.FakeConfig
+    cog_module.cog_data_path = lambda *args, **kwargs: data_path
+
+    bot = fakes.FakeBot()
+    cog = cog_module.ClashOfClans(bot)
+    cog.BASE_URL = base_url
+
+    await cog.config.token.set("benchmark-token")
+    await cog.emoji_loop
+
+    return cog, bot
+
+
+async def bench_command(
+    cog, bot, name: str, args, invocations: int, concurrency: int, cold: bool
+):
+    command = getattr(cog, name)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    # Invocations that only got an error message back instead of an embed
+    failures = 0
+
+    author = fakes.FakeUser()
+    await cog.config.user(author).accounts.set(PLAYER_TAGS)
+    await cog.config.user(author).clan.set(CLAN_TAG)
+
+    # Written the way the link commands do it, config and the link index
+    for tag in PLAYER_TAGS:
+        cog.links.link(author.id, tag)
+    cog.links.link_clan(author.id, CLAN_TAG)
+
+    async def invoke():
+        async with semaphore:
+            if cold:
+                cog.cache.clear()
+
+            ctx = fakes.FakeContext(bot, cog, author)
+            started = time.perf_counter()
+            await command.callback(cog, ctx, *args)
+            latencies.append(time.perf_counter() - started)
+
+            if not any(message.embed for message in ctx.sent):
+                nonlocal failures
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(invoke() for _ in range(invocations)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "invocations": invocations,
+        "throughput": invocations / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "failures": failures,
+    }
+
+
+async def run(args) -> Dict:
+    api = MockClashAPI(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        # What a command that lost track of its tag asks for
+        not_found=["None"],
+        seed=0,
+    )
+    base_url = await api.start()
+
+    cog, bot = await make_cog(base_url, Path(tempfile.mkdtemp()))
+    cog.keys.set_rate(args.rate_limit)
+
+    results = {}
+
+    try:
+        for name, command_args in SCENARIOS.items():
+            if args.only and name not in args.only:
+                continue
+
+            cog.cache.clear()
+            before = sum(api.hits.values())
+
+            results[name] = await bench_command(
+                cog,
+                bot,
+                name,
+                command_args,
+                args.invocations,
+                args.concurrency,
+                args.cold,
+            )
+            results[name]["api_requests"] = sum(api.hits.values()) - before
+    finally:
+        cog.cog_unload()
+        await asyncio.sleep(0)
+        await api.stop()
+
+    return results
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=1000)
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--only", nargs="*", help="Only run these commands.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    return parser
+
+
+def main():
+    args = make_parser().parse_args()
+    results = asyncio.get_event_loop().run_until_complete(run(args))
+
+    if args.json:
+        return print(json.dumps(results, indent=4))
+
+    print(
+        f"{'command':<15}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'api':>8}"
+    )
+
+    for name, result in results.items():
+        print(
+            f"{name:<15}{result['throughput']:>10.1f}"
+            + "".join(f"{result[q] * 1000:>10.1f}" for q in ("p50", "p95", "p99"))
+            + f"{result['api_requests']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Just enough of Red and discord.py to run cog commands outside of a bot."""
+
+import asyncio
+import copy
+import itertools
+from typing import Any, Dict, List
+
+import discord
+
+_ids = itertools.count(1)
+
+
+class FakeValue:
+    """An in-memory stand-in for a Red ``Value`` or ``Group``."""
+
+    def __init__(self, data: Dict, path: List[str], default: Any):
+        self._data = data
+        self._path = path
+        self._default = default
+
+    def __getattr__(self, name: str) -> "FakeValue":
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return FakeValue(self._data, [*self._path, name], (self._default or {})[name])
+
+    def _stored(self):
+        node = self._data
+
+        for key in self._path:
+            if not isinstance(node, dict) or key not in node:
+                raise KeyError(key)
+            node = node[key]
+
+        return node
+
+    def _get(self):
+        try:
+            stored = self._stored()
+        except KeyError:
+            return copy.deepcopy(self._default)
+
+        if isinstance(self._default, dict) and isinstance(stored, dict):
+            return {**copy.deepcopy(self._default), **copy.deepcopy(stored)}
+
+        return copy.deepcopy(stored)
+
+    def __call__(self):
+        return _ValueContext(self)
+
+    async def all(self):
+        return self._get()
+
+    async def set(self, value):
+        node = self._data
+
+        for key in self._path[:-1]:
+            node = node.setdefault(key, {})
+
+        node[self._path[-1]] = copy.deepcopy(value)
+
+    async def set_raw(self, *keys, value):
+        await FakeValue(self._data, [*self._path, *keys], None).set(value)
+
+    async def clear(self):
+        node = self._data
+
+        try:
+            for key in self._path[:-1]:
+                node = node[key]
+            del node[self._path[-1]]
+        except KeyError:
+            pass
+
+
+class _ValueContext:
+    def __init__(self, value: FakeValue):
+        self.value = value
+        self.raw = None
+
+    def __await__(self):
+        return self.value.all().__await__()
+
+    async def __aenter__(self):
+        self.raw = self.value._get()
+        return self.raw
+
+    async def __aexit__(self, *exc):
+        await self.value.set(self.raw)
+
+
+class FakeConfig(FakeValue):
+    """Replaces ``Config.get_conf`` so no Red data directory is needed."""
+
+    def __init__(self):
+        self._storage = {"GLOBAL": {}, "USER": {}, "GUILD": {}}
+        self._defaults = {"GLOBAL": {}, "USER": {}, "GUILD": {}}
+
+        super().__init__(self._storage, ["GLOBAL"], self._defaults["GLOBAL"])
+
+    @classmethod
+    def get_conf(cls, *args, **kwargs):
+        return cls()
+
+    def register_global(self, **defaults):
+        self._defaults["GLOBAL"].update(defaults)
+
+    def register_user(self, **defaults):
+        self._defaults["USER"].update(defaults)
+
+    def register_guild(self, **defaults):
+        self._defaults["GUILD"].update(defaults)
+
+    def user_from_id(self, user_id: int) -> FakeValue:
+        return FakeValue(self._storage, ["USER", str(user_id)], self._defaults["USER"])
+
+    def user(self, user) -> FakeValue:
+        return self.user_from_id(user.id)
+
+    def guild_from_id(self, guild_id: int) -> FakeValue:
+        return FakeValue(
+            self._storage, ["GUILD", str(guild_id)], self._defaults["GUILD"]
+        )
+
+    def guild(self, guild) -> FakeValue:
+        return self.guild_from_id(guild.id)
+
+    async def _all(self, scope: str) -> Dict[int, Dict]:
+        return {
+            int(key): {**copy.deepcopy(self._defaults[scope]), **copy.deepcopy(data)}
+            for key, data in self._storage[scope].items()
+        }
+
+    async def all_users(self):
+        return await self._all("USER")
+
+    async def all_guilds(self):
+        return await self._all("GUILD")
+
+
+class FakeUser:
+    def __init__(self, name: str = "Benchmark"):
+        self.id = next(_ids)
+        self.name = name
+        self.bot = False
+        self.avatar_url = ""
+        self.mention = f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, members: List[FakeUser] = (), name: str = "Benchmark"):
+        self.id = next(_ids)
+        self.name = name
+        self.members = {member.id: member for member in members}
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeState:
+    self_id = 0
+
+
+class FakeChannel:
+    def __init__(self):
+        self.id = next(_ids)
+
+    def permissions_for(self, member):
+        return discord.Permissions.none()
+
+
+class FakeMessage:
+    def __init__(self, content=None, embed=None, file=None):
+        self.id = next(_ids)
+        # Red's reaction predicates need the bot's own id
+        self._state = FakeState()
+        self.channel = FakeChannel()
+        self.content = content
+        self.embed = embed
+        self.file = file
+        self.embeds = [embed] if embed else []
+        # Every embed the message has shown, edits included
+        self.shown = [embed]
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def remove_reaction(self, emoji, member):
+        pass
+
+    async def clear_reactions(self):
+        pass
+
+    async def edit(self, **kwargs):
+        self.embed = kwargs.get("embed", self.embed)
+        self.shown.append(self.embed)
+
+    async def delete(self):
+        pass
+
+
+class FakeReaction:
+    def __init__(self, emoji: str):
+        self.emoji = emoji
+
+
+class FakeBot:
+    def __init__(self, reactions: List[str] = ()):
+        self.loop = asyncio.get_event_loop()
+        # Emojis "clicked" on menus, in order
+        self.reactions = list(reactions)
+
+    async def use_buttons(self):
+        return False
+
+    async def wait_until_ready(self):
+        pass
+
+    def get_emoji(self, emoji_id):
+        return None
+
+    def get_channel(self, channel_id):
+        return None
+
+    def get_guild(self, guild_id):
+        return None
+
+    async def wait_for(self, event, check=None, timeout=None):
+        if event == "reaction_remove":
+            # Only added reactions are scripted, so wait for those instead
+            await asyncio.Event().wait()
+
+        if event != "reaction_add" or not self.reactions:
+            raise asyncio.TimeoutError()
+
+        return FakeReaction(self.reactions.pop(0)), None
+
+
+class FakeContext:
+    """A command context that records what would have been sent."""
+
+    def __init__(self, bot: FakeBot, cog, author: FakeUser = None):
+        self.bot = bot
+        self.cog = cog
+        self.author = author or FakeUser()
+        self.prefix = "[p]"
+        self.command = None
+        self.guild = None
+        self.me = None
+        self.message = FakeMessage()
+        self.sent: List[FakeMessage] = []
+
+    async def send(self, content=None, *, embed=None, file=None, **kwargs):
+        if embed is not None and not isinstance(embed, discord.Embed):
+            raise TypeError("embed must be a discord.Embed")
+
+        message = FakeMessage(content, embed, file)
+        self.sent.append(message)
+
+        return message
+
+    async def embed_colour(self):
+        return discord.Colour.red()
+
+    async def tick(self):
+        pass
@@ -0,0 +1,360 @@
+"""Realistic, deterministic Clash of Clans API payloads for the mock server.
+
+Every payload is generated from its tag, so the same tag always gives the same
+data and any tag is valid unless the server is told otherwise.
+"""
+
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+
+TIME_FORMAT = "%Y%m%dT%H%M%S.000Z"
+
+TROOPS = [
+    ("Barbarian", 10, "home"),
+    ("Archer", 10, "home"),
+    ("Giant", 10, "home"),
+    ("Goblin", 8, "home"),
+    ("Wall Breaker", 10, "home"),
+    ("Balloon", 10, "home"),
+    ("Wizard", 10, "home"),
+    ("Healer", 7, "home"),
+    ("Dragon", 9, "home"),
+    ("P.E.K.K.A", 9, "home"),
+    ("Baby Dragon", 8, "home"),
+    ("Miner", 8, "home"),
+    ("Electro Dragon", 5, "home"),
+    ("Yeti", 4, "home"),
+    ("Minion", 10, "home"),
+    ("Hog Rider", 10, "home"),
+    ("Valkyrie", 9, "home"),
+    ("Golem", 11, "home"),
+    ("Witch", 5, "home"),
+    ("Lava Hound", 6, "home"),
+    ("Bowler", 6, "home"),
+    ("Wall Wrecker", 4, "home"),
+    ("Battle Blimp", 4, "home"),
+    ("L.A.S.S.I", 10, "home"),
+    ("Raged Barbarian", 18, "builderBase"),
+    ("Sneaky Archer", 18, "builderBase"),
+    ("Baby Dragon", 18, "builderBase"),
+    ("Night Witch", 18, "builderBase"),
+]
+
+SPELLS = [
+    ("Lightning Spell", 9),
+    ("Healing Spell", 8),
+    ("Rage Spell", 6),
+    ("Freeze Spell", 7),
+    ("Poison Spell", 8),
+    ("Earthquake Spell", 5),
+    ("Haste Spell", 5),
+    ("Bat Spell", 5),
+]
+
+HEROES = [
+    ("Barbarian King", 80, 7),
+    ("Archer Queen", 80, 9),
+    ("Grand Warden", 55, 11),
+    ("Royal Champion", 30, 13),
+    ("Battle Machine", 30, 0),
+]
+
+ROLES = ["member"] * 6 + ["admin"] * 3 + ["coLeader"]
+NAMES = ["Goblin", "Wizard", "Hog", "Valk", "Drag", "Pekka", "Miner", "Yeti", "Bowler"]
+
+
+def rng(tag: str) -> random.Random:
+    return random.Random(zlib.crc32(tag.encode()))
+
+
+def clan_member_tags(clan_tag: str, count: int):
+    return [f"#{clan_tag.strip('#')}M{index:02}" for index in range(count)]
+
+
+def player(tag: str, clan_tag: str = "#2PP") -> dict:
+    tag = "#" + tag.strip("#")
+    r = rng(tag)
+    townhall = r.randint(7, 14)
+
+    def level(max_level):
+        return max(1, min(max_level, round(max_level * r.uniform(0.5, 1.1))))
+
+    return {
+        "tag": tag,
+        "name": f"{r.choice(NAMES)}{r.randint(1, 999)}",
+        "townHallLevel": townhall,
+        "expLevel": r.randint(50, 250),
+        "trophies": r.randint(1000, 5500),
+        "bestTrophies": r.randint(5500, 6500),
+        "warStars": r.randint(0, 1500),
+        "attackWins": r.randint(0, 300),
+        "defenseWins": r.randint(0, 50),
+        "builderHallLevel": r.randint(1, 9),
+        "versusTrophies": r.randint(1000, 4500),
+        "bestVersusTrophies": r.randint(4500, 5000),
+        "versusBattleWins": r.randint(0, 2000),
+        "role": r.choice(ROLES),
+        "warPreference": r.choice(["in", "out"]),
+        "donations": r.randint(0, 3000),
+        "donationsReceived": r.randint(0, 2000),
+        "clan": {
+            "tag": clan_tag,
+            "name": f"Clan {clan_tag}",
+            "clanLevel": 12,
+            "badgeUrls": {"small": "", "large": "", "medium": ""},
+        },
+        "league": {"id": 29000022, "name": "Legend League"},
+        "achievements": [
+            {
+                "name": name,
+                "stars": 3,
+                "value": r.randint(10 ** 6, 2 * 10 ** 9),
+                "target": 100000000,
+                "info": "",
+                "village": "home",
+            }
+            for name in (
+                "Bigger Coffers",
+                "Gold Grab",
+                "Elixir Escapade",
+                "Heroic Heist",
+                "Sweet Victory!",
+                "Unbreakable",
+                "Friend in Need",
+                "War Hero",
+            )
+        ],
+        "labels": [],
+        "troops": [
+            {
+                "name": name,
+                "level": level(max_level),
+                "maxLevel": max_level,
+                "village": village,
+            }
+            for name, max_level, village in TROOPS
+        ],
+        "heroes": [
+            {
+                "name": name,
+                "level": level(max_level),
+                "maxLevel": max_level,
+                "village": "builderBase" if name == "Battle Machine" else "home",
+            }
+            for name, max_level, required in HEROES
+            if townhall >= required
+        ],
+        "spells": [
+            {
+                "name": name,
+                "level": level(max_level),
+                "maxLevel": max_level,
+                "village": "home",
+            }
+            for name, max_level in SPELLS
+        ],
+    }
+
+
+def clan(tag: str, members: int = 50) -> dict:
+    tag = "#" + tag.strip("#")
+    r = rng(tag)
+
+    member_list = []
+
+    for rank, member_tag in enumerate(clan_member_tags(tag, members), start=1):
+        member = player(member_tag, tag)
+        member_list.append(
+            {
+                "tag": member["tag"],
+                "name": member["name"],
+                "role": "leader" if rank == 1 else member["role"],
+                "expLevel": member["expLevel"],
+                "league": member["league"],
+                "trophies": member["trophies"],
+                "versusTrophies": member["versusTrophies"],
+                "clanRank": rank,
+                "previousClanRank": rank,
+                "donations": member["donations"],
+                "donationsReceived": member["donationsReceived"],
+            }
+        )
+
+    return {
+        "tag": tag,
+        "name": f"Clan {tag}",
+        "type": r.choice(["open", "inviteOnly"]),
+        "description": "A clan served by the mock Clash of Clans API.",
+        "location": {"id": 32000006, "name": "International", "isCountry": False},
+        "badgeUrls": {"small": "", "large": "", "medium": ""},
+        "clanLevel": r.randint(1, 25),
+        "clanPoints": r.randint(10000, 60000),
+        "clanVersusPoints": r.randint(10000, 50000),
+        "requiredTrophies": 2000,
+        "warFrequency": "always",
+        "warWinStreak": r.randint(0, 20),
+        "warWins": r.randint(0, 800),
+        "warTies": r.randint(0, 20),
+        "warLosses": r.randint(0, 200),
+        "isWarLogPublic": True,
+        "warLeague": {"id": 48000015, "name": "Master League I"},
+        "members": members,
+        "labels": [{"id": 56000000, "name": "Clan Wars"}],
+        "requiredVersusTrophies": 0,
+        "requiredTownhallLevel": 9,
+        "memberList": member_list,
+    }
+
+
+def war_clan(tag: str, size: int, attacks_per_member: int, r: random.Random) -> dict:
+    members = []
+
+    for position, member_tag in enumerate(clan_member_tags(tag, size), start=1):
+        attacks = [
+            {
+                "attackerTag": member_tag,
+                "defenderTag": f"#OPP{r.randint(0, size - 1):02}",
+                "stars": r.randint(0, 3),
+                "destructionPercentage": r.randint(20, 100),
+                "order": r.randint(1, size * attacks_per_member),
+                "duration": r.randint(60, 180),
+            }
+            for _ in range(r.randint(0, attacks_per_member))
+        ]
+        members.append(
+            {
+                "tag": member_tag,
+                "name": f"{r.choice(NAMES)}{r.randint(1, 999)}",
+                "townhallLevel": r.randint(9, 14),
+                "mapPosition": position,
+                "opponentAttacks": r.randint(0, 3),
+                "attacks": attacks,
+            }
+        )
+
+    return {
+        "tag": tag,
+        "name": f"Clan {tag}",
+        "badgeUrls": {"small": "", "large": "", "medium": ""},
+        "clanLevel": 20,
+        "attacks": sum(len(member["attacks"]) for member in members),
+        "stars": sum(attack["stars"] for m in members for attack in m["attacks"]),
+        "destructionPercentage": round(r.uniform(30, 100), 2),
+        "members": members,
+    }
+
+
+def current_war(tag: str, size: int = 15) -> dict:
+    tag = "#" + tag.strip("#")
+    r = rng(tag + "war")
+    now = datetime.now(timezone.utc)
+
+    return {
+        "state": "inWar",
+        "teamSize": size,
+        "attacksPerMember": 2,
+        "preparationStartTime": (now - timedelta(hours=30)).strftime(TIME_FORMAT),
+        "startTime": (now - timedelta(hours=6)).strftime(TIME_FORMAT),
+        "endTime": (now + timedelta(hours=18)).strftime(TIME_FORMAT),
+        "clan": war_clan(tag, size, 2, r),
+        "opponent": war_clan("#OPP", size, 2, r),
+    }
+
+
+def league_clans(tag: str):
+    tag = tag.strip("#")
+    return [f"#{tag}"] + [f"#{tag}L{index}" for index in range(1, 8)]
+
+
+def league_group(tag: str, announced_rounds: int = 3) -> dict:
+    clans = league_clans(tag)
+    home = clans[0].strip("#")
+
+    return {
+        "state": "inWar",
+        "season": datetime.now(timezone.utc).strftime("%Y-%m"),
+        "clans": [
+            {"tag": clan_tag, "name": f"Clan {clan_tag}", "clanLevel": 15}
+            for clan_tag in clans
+        ],
+        "rounds": [
+            {
+                "warTags": [
+                    f"#{home}R{number}W{index}" if number < announced_rounds else "#0"
+                    for index in range(4)
+                ]
+            }
+            for number in range(7)
+        ],
+    }
+
+
+def league_war(war_tag: str, announced_rounds: int = 3) -> dict:
+    home, _, rest = war_tag.strip("#").partition("R")
+    number, _, index = rest.partition("W")
+    number, index = int(number), int(index)
+
+    # A round robin, every clan meets every other clan once
+    clans = league_clans(home)
+    rotated = [clans[0]] + clans[1:][number:] + clans[1:][:number]
+    clan_tag, opponent_tag = rotated[index], rotated[7 - index]
+
+    r = rng(war_tag)
+    now = datetime.now(timezone.utc)
+    live = number == announced_rounds - 1
+
+    return {
+        "state": "inWar" if live else "warEnded",
+        "teamSize": 15,
+        "attacksPerMember": 1,
+        "preparationStartTime": (
+            now - timedelta(days=announced_rounds - number)
+        ).strftime(TIME_FORMAT),
+        "startTime": (now - timedelta(hours=6)).strftime(TIME_FORMAT),
+        "endTime": (now + timedelta(hours=18)).strftime(TIME_FORMAT),
+        "clan": war_clan(clan_tag, 15, 1, r),
+        "opponent": war_clan(opponent_tag, 15, 1, r),
+    }
+
+
+LOCATIONS = [
+    {"id": 32000006, "name": "International", "isCountry": False},
+    {"id": 32000249, "name": "United States", "isCountry": True, "countryCode": "US"},
+    {"id": 32000094, "name": "Germany", "isCountry": True, "countryCode": "DE"},
+]
+
+
+def locations() -> dict:
+    return {"items": LOCATIONS, "paging": {"cursors": {}}}
+
+
+def clan_search(
+    name: str, limit: int, after: int = 0, min_members: int = 0, total: int = 35
+) -> dict:
+    """A page of search results, ``after`` is the offset of the page."""
+
+    items = []
+
+    for index in range(after, total):
+        result = clan(f"#S{zlib.crc32(name.encode()) % 1000}X{index}", members=0)
+        result["members"] = rng(result["tag"]).randint(1, 50)
+
+        if result["members"] < min_members:
+            continue
+
+        del result["memberList"]
+        result["name"] = f"{name} {index}"
+        items.append(result)
+
+        if len(items) == limit:
+            break
+
+    next_offset = index + 1
+
+    return {
+        "items": items,
+        "paging": {
+            "cursors": {"after": str(next_offset)} if next_offset < total else {}
+        },
+    }
@@ -0,0 +1,162 @@
+"""A local stand-in for the Clash of Clans API.
+
+It serves the fixtures in ``fixtures.py`` with configurable latency, errors
+and throttling, so the cog can be driven without a token or network access.
+
+Run it on its own with ``python -m benchmarks.mock_api --port 8080`` and point
+``ClashOfClans.BASE_URL`` at ``http://127.0.0.1:8080/v1/``.
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from typing import Iterable, Optional
+
+from aiohttp import web
+
+from . import fixtures
+
+
+class MockClashAPI:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.1,
+        not_found: Iterable[str] = (),
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.not_found = {"#" + tag.strip("#") for tag in not_found}
+
+        self.random = random.Random(seed)
+        self.hits: Counter = Counter()
+
+        self.app = web.Application(middlewares=[self.middleware])
+        self.app.router.add_get("/v1/players/{tag}", self.player)
+        self.app.router.add_get("/v1/clans/{tag}", self.clan)
+        self.app.router.add_get("/v1/clans/{tag}/currentwar", self.current_war)
+        self.app.router.add_get(
+            "/v1/clans/{tag}/currentwar/leaguegroup", self.league_group
+        )
+        self.app.router.add_get("/v1/clanwarleagues/wars/{tag}", self.league_war)
+        self.app.router.add_get("/v1/clans", self.clan_search)
+        self.app.router.add_get("/v1/locations", self.locations)
+
+        self.runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        path = request.path[len("/v1/") :]
+        last = path.rsplit("/", 1)[-1]
+        family = last if last in ("currentwar", "leaguegroup") else path.split("/")[0]
+
+        if path == "clans":
+            family = "search"
+        self.hits[family] += 1
+
+        await asyncio.sleep(
+            max(0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        )
+
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response(
+                {"reason": "accessDenied", "message": "Invalid authorization"},
+                status=403,
+            )
+
+        roll = self.random.random()
+
+        if roll < self.throttle_rate:
+            return web.json_response(
+                {"reason": "requestThrottled"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        if roll < self.throttle_rate + self.error_rate:
+            return web.json_response({"reason": "unknownException"}, status=500)
+
+        if request.match_info.get("tag") in self.not_found:
+            return web.json_response({"reason": "notFound"}, status=404)
+
+        return await handler(request)
+
+    async def player(self, request: web.Request):
+        return web.json_response(fixtures.player(request.match_info["tag"]))
+
+    async def clan(self, request: web.Request):
+        return web.json_response(fixtures.clan(request.match_info["tag"]))
+
+    async def current_war(self, request: web.Request):
+        return web.json_response(fixtures.current_war(request.match_info["tag"]))
+
+    async def league_group(self, request: web.Request):
+        return web.json_response(fixtures.league_group(request.match_info["tag"]))
+
+    async def league_war(self, request: web.Request):
+        return web.json_response(fixtures.league_war(request.match_info["tag"]))
+
+    async def clan_search(self, request: web.Request):
+        query = request.query
+
+        return web.json_response(
+            fixtures.clan_search(
+                query.get("name", ""),
+                int(query.get("limit", 10)),
+                int(query.get("after", 0)),
+                int(query.get("minMembers", 0)),
+            )
+        )
+
+    async def locations(self, request: web.Request):
+        return web.json_response(fixtures.locations())
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}/v1/"
+
+        return self.url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def serve(args):
+    api = MockClashAPI(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    url = await api.start(port=args.port)
+    print(f"Mock Clash of Clans API running at {url}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+
+    asyncio.run(serve(parser.parse_args()))
@@ -0,0 +1,56 @@
+from collections import Counter, defaultdict
+from statistics import mean
+from typing import Dict, Iterable, List
+
+
+def home_troops(player: Dict) -> List[Dict]:
+    return [troop for troop in player.get("troops", []) if troop["village"] == "home"]
+
+
+def summarize_members(players: Iterable[Dict]) -> Dict:
+    """Summarizes the profiles of a clan's members.
+
+    The profiles are turned into columns in a single pass, then every
+    statistic is worked out from the columns instead of the raw JSON.
+    """
+
+    townhalls: List[int] = []
+    opted_in: List[bool] = []
+    maxed_ratios: List[float] = []
+    hero_levels: Dict[str, List[int]] = defaultdict(list)
+    hero_max: Dict[str, int] = {}
+
+    for player in players:
+        townhalls.append(player["townHallLevel"])
+        opted_in.append(player.get("warPreference") == "in")
+
+        troops = home_troops(player)
+        if troops:
+            maxed = sum(troop["level"] == troop["maxLevel"] for troop in troops)
+            maxed_ratios.append(maxed / len(troops))
+
+        for hero in player.get("heroes", []):
+            if hero["village"] == "home":
+                hero_levels[hero["name"]].append(hero["level"])
+                hero_max[hero["name"]] = hero["maxLevel"]
+
+    members = len(townhalls)
+
+    ready_townhalls = [th for th, ready in zip(townhalls, opted_in) if ready]
+
+    return {
+        "members": members,
+        "townhalls": dict(sorted(Counter(townhalls).items(), reverse=True)),
+        "heroes": {
+            name: {
+                "average": mean(levels),
+                "max": hero_max[name],
+                "unlocked": len(levels),
+            }
+            for name, levels in hero_levels.items()
+        },
+        "troops_maxed": mean(maxed_ratios) if maxed_ratios else 0.0,
+        "fully_maxed": sum(ratio == 1 for ratio in maxed_ratios),
+        "war_ready": len(ready_townhalls),
+        "war_ready_townhall": mean(ready_townhalls) if ready_townhalls else 0.0,
+    }
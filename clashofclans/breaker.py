@@ -0,0 +1,65 @@
+import time
+
+
+class CircuitBreaker:
+    """Stops requests to the API after too many failures in a row.
+
+    After ``threshold`` consecutive failures the circuit opens and requests
+    fail straight away. Once ``reset_timeout`` seconds have passed a single
+    probe request is let through, which closes the circuit if it works and
+    opens it again if it doesn't.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half open"
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def allow(self) -> bool:
+        state = self.state
+
+        if state == self.CLOSED:
+            return True
+
+        if state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+
+        return False
+
+    def record(self, healthy: bool):
+        self.probing = False
+
+        if healthy:
+            self.failures = 0
+            self._state = self.CLOSED
+            return
+
+        self.failures += 1
+
+        if self._state == self.HALF_OPEN or self.failures >= self.threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
@@ -0,0 +1,215 @@
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_TTLS = {
+    "players": 120,
+    "clans": 60,
+    "currentwar": 30,
+    "leaguegroup": 300,
+    "clanwarleagues": 60,
+    "search": 60,
+    "locations": 86400,
+}
+
+# How long expired data is kept around to be served when it has to be
+MAX_STALE = 86400
+
+
+def max_age(cache_control: Optional[str]) -> Optional[int]:
+    """Returns the max-age of a Cache-Control header, if it has one."""
+
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+
+    return int(match.group(1)) if match else None
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Returns the family an endpoint belongs to, used for TTLs and stats."""
+
+    endpoint, _, query = endpoint.partition("?")
+
+    # Locations are listed with a limit, but aren't a search
+    if query and "/" not in endpoint and endpoint != "locations":
+        # Searches like clans?name=...
+        return "search"
+
+    if endpoint.endswith("/currentwar"):
+        return "currentwar"
+
+    if endpoint.endswith("/leaguegroup"):
+        return "leaguegroup"
+
+    return endpoint.split("/", 1)[0]
+
+
+class Payload(dict):
+    """A decoded API response that remembers where and when it came from.
+
+    It also keeps what is needed to revalidate it: the ETag and Last-Modified
+    headers, and a digest of the raw body for when the server sends neither.
+    """
+
+    __slots__ = ("endpoint", "fetched_at", "ttl", "etag", "last_modified", "digest")
+
+    def __init__(
+        self, data: Dict, endpoint: str, fetched_at: float, ttl: Optional[float] = None
+    ):
+        super().__init__(data)
+
+        self.endpoint = endpoint
+        self.fetched_at = fetched_at
+        # Overrides the family's TTL, infinity for data that can never change
+        self.ttl = ttl
+
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[str] = None
+
+    def validators(self) -> Dict[str, str]:
+        """Headers that make a request conditional on this data having changed."""
+
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """A size bounded LRU cache of decoded API responses.
+
+    Every endpoint family has its own time to live, endpoints without one are
+    never cached. Expired entries are kept until they are evicted so they can
+    still be served as stale data.
+    """
+
+    def __init__(self, maxsize: int = 512, ttls: Optional[Dict[str, int]] = None):
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+        # The same counts split up by endpoint family
+        self.family_hits: Counter = Counter()
+        self.family_misses: Counter = Counter()
+
+        self._entries: "OrderedDict[str, Payload]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, endpoint: str) -> bool:
+        return endpoint in self._entries
+
+    def ttl(self, endpoint: str) -> Optional[int]:
+        return self.ttls.get(endpoint_family(endpoint))
+
+    def is_stale(self, data) -> bool:
+        if not isinstance(data, Payload):
+            return False
+
+        ttl = self.ttl(data.endpoint) if data.ttl is None else data.ttl
+
+        return time.time() - data.fetched_at > ttl
+
+    def get(self, endpoint: str) -> Optional[Payload]:
+        data = self._entries.get(endpoint)
+
+        if data is None or self.is_stale(data):
+            self.misses += 1
+            self.family_misses[endpoint_family(endpoint)] += 1
+            return None
+
+        self._entries.move_to_end(endpoint)
+        self.hits += 1
+        self.family_hits[endpoint_family(endpoint)] += 1
+
+        return data
+
+    def peek(self, endpoint: str) -> Optional[Payload]:
+        """Returns the cached data however old it is, without counting a lookup."""
+
+        return self._entries.get(endpoint)
+
+    def revalidated(
+        self, data: Payload, fetched_at: float, ttl: Optional[float] = None
+    ) -> Payload:
+        """Marks cached data as fresh again after the API said it hasn't changed."""
+
+        data.fetched_at = fetched_at
+        data.ttl = ttl
+
+        if data.endpoint in self._entries:
+            self._entries.move_to_end(data.endpoint)
+
+        return data
+
+    def get_stale(self, endpoint: str) -> Optional[Payload]:
+        """Returns the cached data even if it has expired, within ``MAX_STALE``."""
+
+        data = self._entries.get(endpoint)
+
+        if data is None or time.time() - data.fetched_at > MAX_STALE:
+            return None
+
+        self._entries.move_to_end(endpoint)
+        self.stale_hits += 1
+
+        return data
+
+    def set(
+        self,
+        endpoint: str,
+        data: Dict,
+        fetched_at: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> Optional[Payload]:
+        if not self.ttl(endpoint):
+            return None
+
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        return self._put(Payload(data, endpoint, fetched_at, ttl))
+
+    def restore(self, data: Payload) -> Optional[Payload]:
+        """Adds a payload saved earlier as it is, validators and all."""
+
+        if not self.ttl(data.endpoint):
+            return None
+
+        return self._put(data)
+
+    def _put(self, data: Payload) -> Payload:
+        self._entries[data.endpoint] = data
+        self._entries.move_to_end(data.endpoint)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return data
+
+    def invalidate(self, endpoint: str):
+        self._entries.pop(endpoint, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,24 +1,48 @@
 import asyncio
+import hashlib
+import io
+import json
 import logging
 import math
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import aiohttp
 import discord
 from redbot.core import Config, commands
-from redbot.core.utils.menus import (menu, next_page, prev_page,
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.menus import (next_page, prev_page,
                                      start_adding_reactions)
 from redbot.core.utils.predicates import ReactionPredicate
 
+from .analytics import summarize_members
+from .breaker import CircuitBreaker
+from .cache import Payload, ResponseCache, endpoint_family, max_age
 from .converters import EmojiConverter, TagConverter, UnlinkTagConverter
+from .cwl import (compute_standings, current_round, group_endpoint,
+                  war_endpoint, war_tags, war_ttl)
+from .history import METRICS, History, sparkline
+from .keypool import STRATEGIES, KeyPool
+from .leaderboard import SORT_KEYS, Leaderboard
+from .links import LinkIndex
+from .menus import LazyPages, StreamPages, lazy_menu
+from .metrics import Metrics, format_latency
+from .prewarm import Prewarmer
+from .ratelimit import backoff_delay
+from .render import EmbedCache
+from .rolesync import RANK_NAMES, RoleSync
+from .scheduler import Priority, PriorityScheduler, RequestShed, Ticket
+from .store import SnapshotStore
+from .warwatch import WarWatcher
 
 logger = logging.getLogger("red.finger_cogs.clashofclans")
 
 
 async def has_account(ctx) -> bool:
-    account = await ctx.cog.config.user(ctx.author).accounts()
+    account = await ctx.cog.linked_accounts(ctx.author)
 
     if not account:
         raise commands.UserFeedbackCheckFailure(
@@ -41,6 +65,12 @@ class TroopTypes(Enum):
 
 class ClashOfClans(commands.Cog):
     BASE_URL = "https://api.clashofclans.com/v1/"
+    RETRY_STATUSES = (429, 503)
+    SEARCH_PAGE_SIZE = 10
+    MAX_SEARCH_RESULTS = 100
+    MAX_RETRIES = 3
+    # Part of the rate limit kept for commands, background requests wait for the rest
+    BACKGROUND_RESERVE = 0.25
 
     def __init__(self, bot):
         self.bot = bot
@@ -138,19 +168,75 @@ class ClashOfClans(commands.Cog):
 
         self.default_controls = {"⬅️": prev_page, "➡️": next_page}
 
-        self.default_headers: Dict = {"Authorization": ""}
+        # Created lazily so it belongs to the running loop, see get_session
+        self.session: Optional[aiohttp.ClientSession] = None
 
-        self.session = aiohttp.ClientSession()
+        self.cache = ResponseCache()
+        self.embeds = EmbedCache()
+        self.api_metrics = Metrics()
+
+        # Requests currently being made, so identical ones can share them
+        self.inflight: Dict[str, Tuple[asyncio.Task, Ticket]] = {}
+
+        self.keys = KeyPool(10)
+
+        self.links = LinkIndex()
+
+        self.prewarmer = Prewarmer(self)
+
+        self.warwatcher = WarWatcher(self)
+
+        self.rolesync = RoleSync(self)
+
+        self.serve_stale = False
+
+        self.breaker = CircuitBreaker()
+
+        self.scheduler = PriorityScheduler(100, self.background_room)
+
+        self.store = SnapshotStore(cog_data_path(self) / "snapshots.sqlite3")
+
+        self.history = History(self, cog_data_path(self) / "history.sqlite3")
 
         self.issue_response = "There was an issue with the request. Please check the logs to find the error."
 
-        self.default_global = {"token": None, "emojis": self.gen_default_emojis()}
+        self.default_global = {
+            "token": None,
+            "tokens": [],
+            "key_strategy": "roundrobin",
+            "emojis": self.gen_default_emojis(),
+            "concurrency": 5,
+            "rate_limit": 10,
+            "connection": {
+                "limit": 100,
+                "limit_per_host": 30,
+                "keepalive_timeout": 30,
+                "ttl_dns_cache": 300,
+                "connect_timeout": 5,
+                "read_timeout": 10,
+            },
+            "prewarm": False,
+            "prewarm_budget": 60,
+            "serve_stale": False,
+        }
         self.default_user = {"accounts": [], "clan": None}
+        self.default_guild = {
+            # Clan tags mapped to the channel their war updates are posted in
+            "war_watch": {},
+            # Town hall levels, clan tags and clan ranks mapped to role ids
+            "role_sync": {"townhall": {}, "clan": {}, "rank": {}},
+        }
 
         self.config.register_global(**self.default_global)
         self.config.register_user(**self.default_user)
+        self.config.register_guild(**self.default_guild)
 
         self.emoji_loop = self.bot.loop.create_task(self.initialize())
+        self.prewarm_loop = self.bot.loop.create_task(self.prewarmer.run())
+        self.store_loop = self.bot.loop.create_task(self.store.run())
+        self.war_loop = self.bot.loop.create_task(self.warwatcher.run())
+        self.history_loop = self.bot.loop.create_task(self.history.run())
+        self.role_loop = self.bot.loop.create_task(self.rolesync.run())
 
     def gen_default_emojis(self):
         emojis = {troop_name: None for troop_name in self.all_troops.keys()}
@@ -160,17 +246,31 @@ class ClashOfClans(commands.Cog):
 
         return emojis
 
-    async def update_headers(self):
-        token = await self.config.token()
-        if not token:
-            return
-
-        self.default_headers["Authorization"] = "Bearer " + token
+    async def update_tokens(self):
+        self.keys.set_tokens([await self.config.token(), *await self.config.tokens()])
+        self.keys.strategy = await self.config.key_strategy()
 
     async def initialize(self):
+        self.keys.set_rate(await self.config.rate_limit())
+        self.scheduler.set_slots(await self.request_slots())
+        self.serve_stale = await self.config.serve_stale()
+
+        self.links.load(await self.config.all_users())
+        self.warwatcher.load(await self.config.all_guilds())
+
+        try:
+            snapshots = await self.store.load(self.cache.maxsize)
+        except Exception:
+            # Starting with an empty cache beats not starting at all
+            logger.exception("Error while loading snapshots.")
+            snapshots = []
+
+        for data in snapshots:
+            self.cache.restore(data)
+
         await self.bot.wait_until_ready()
         await self.generate_emojis()
-        await self.update_headers()
+        await self.update_tokens()
 
     async def generate_emojis(self):
         emojis = await self.config.emojis()
@@ -183,17 +283,76 @@ class ClashOfClans(commands.Cog):
 
             self.emojis[emoji_name] = {"emoji": emoji, "fallback": fallback}
 
+        # Rendered embeds may have the old emojis in them
+        self.embeds.invalidate()
+
     def cog_unload(self):
         if self.emoji_loop:
             self.emoji_loop.cancel()
 
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(self.session.close())
+        if self.prewarm_loop:
+            self.prewarm_loop.cancel()
+
+        if self.store_loop:
+            self.store_loop.cancel()
+
+        if self.war_loop:
+            self.war_loop.cancel()
+
+        if self.history_loop:
+            self.history_loop.cancel()
+
+        if self.role_loop:
+            self.role_loop.cancel()
+
+        asyncio.create_task(self.store.flush())
+        asyncio.create_task(self.history.flush())
+
+        if self.session:
+            asyncio.create_task(self.session.close())
+
+    def background_room(self) -> float:
+        """How many background requests can start without using the reserve."""
+
+        capacity = sum(
+            key.bucket.capacity for key in self.keys.keys if not key.suspended
+        )
+
+        return self.keys.available() - capacity * self.BACKGROUND_RESERVE
+
+    async def request_slots(self) -> int:
+        # The scheduler hands out as many slots as there are connections
+        return (await self.config.connection.limit()) or 1000
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            settings = await self.config.connection()
+
+            if self.session and not self.session.closed:
+                # Another request made one while we were reading the settings
+                return self.session
+
+            connector = aiohttp.TCPConnector(
+                limit=settings["limit"],
+                limit_per_host=settings["limit_per_host"],
+                keepalive_timeout=settings["keepalive_timeout"],
+                ttl_dns_cache=settings["ttl_dns_cache"],
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=settings["connect_timeout"],
+                sock_read=settings["read_timeout"],
+            )
+
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        return self.session
 
     async def red_delete_data_for_user(self, requester, user_id):
-        for user in await self.config.all_users():
-            if user_id == user:
-                await self.config.user_from_id(user_id).clear()
+        await self.links.ready.wait()
+
+        if self.links.has_links(user_id):
+            await self.config.user_from_id(user_id).clear()
+            self.links.forget(user_id)
 
     @commands.group(name="clash")
     async def clash(self, ctx):
@@ -206,7 +365,7 @@ class ClashOfClans(commands.Cog):
         **playerTag**, leaving this blank will show you your linked account.
         """
 
-        tags = await self.config.user(ctx.author).accounts()
+        tags = await self.linked_accounts(ctx.author)
 
         if playerTag is None:
             if not tags:
@@ -227,28 +386,35 @@ class ClashOfClans(commands.Cog):
             elif data == 404:
                 return await ctx.send("Player was not found.")
 
-            return await ctx.send(
-                embed=await self.generate_user_embed(data, await ctx.embed_colour())
+            embed = await self.cached_embed(
+                "player", data, await ctx.embed_colour(), self.generate_user_embed
             )
 
-        embeds = []
+            return await ctx.send(embed=self.mark_stale(embed, data))
 
-        for page_num, tag in enumerate(playerTags, start=1):
-            data = await self.request(f"players/%23{tag}")
+        embed_colour = await ctx.embed_colour()
 
-            if not data or data == 404:
-                continue
+        async def render(index: int) -> discord.Embed:
+            data = await self.request(f"players/%23{playerTags[index]}")
 
-            embed = await self.generate_user_embed(data, await ctx.embed_colour())
-
-            embed.set_footer(text=f"User {page_num} of {len(tags)}")
+            if not data or data == 404:
+                embed = discord.Embed(
+                    description=f"Player `#{playerTags[index]}` was not found."
+                    if data == 404
+                    else self.issue_response,
+                    colour=embed_colour,
+                )
+            else:
+                embed = await self.cached_embed(
+                    "player", data, embed_colour, self.generate_user_embed
+                )
 
-            embeds.append(embed)
+            embed.set_footer(text=f"User {index + 1} of {len(playerTags)}")
 
-        if not embeds:
-            return await ctx.send("Clan was not found.")
+            return self.mark_stale(embed, data)
 
-        await menu(ctx, embeds, self.default_controls)
+        # Profiles are only fetched when someone pages to them
+        await lazy_menu(ctx, LazyPages(len(playerTags), render))
 
     @clash.command(aliases=["unit"])
     async def army(self, ctx, playerTag: Optional[TagConverter]):
@@ -257,7 +423,7 @@ class ClashOfClans(commands.Cog):
         **playerTag**, leaving this blank will show you your linked account.
         """
 
-        tags = await self.config.user(ctx.author).accounts()
+        tags = await self.linked_accounts(ctx.author)
 
         if playerTag is None:
             if not tags:
@@ -272,9 +438,9 @@ class ClashOfClans(commands.Cog):
 
         embed = discord.Embed(colour=await ctx.embed_colour())
 
-        for tag in playerTags:
-            data = await self.request(f"players/%23{tag}")
+        results = await self.fetch_many(f"players/%23{tag}" for tag in playerTags)
 
+        for tag, data in zip(playerTags, results):
             if not data or data == 404:
                 continue
 
@@ -333,7 +499,7 @@ class ClashOfClans(commands.Cog):
                         inline=False,
                     )
 
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self.mark_stale(embed, *results))
 
     @clash.command()
     async def clan(self, ctx, clanTag: Optional[TagConverter]):
@@ -342,7 +508,7 @@ class ClashOfClans(commands.Cog):
         **clanTag**, leaving this blank will show you your linked clan.
         """
 
-        tag = await self.config.user(ctx.author).clan()
+        tag = await self.linked_clan(ctx.author)
 
         if clanTag is None:
             if not tag:
@@ -350,7 +516,7 @@ class ClashOfClans(commands.Cog):
                     f"Please enter a valid clan tag or link your clan using `{ctx.prefix}clash linkclan`."
                 )
 
-            clanTag = clanTag
+            clanTag = tag
 
         data = await self.request(f"clans/%23{clanTag}")
 
@@ -360,44 +526,11 @@ class ClashOfClans(commands.Cog):
         elif data == 404:
             return await ctx.send("Clan was not found.")
 
-        embed = discord.Embed(
-            description=f"**Level {data['clanLevel']}, Members {data['members']}, {data['clanPoints']} Trophies, {data['clanVersusPoints']} versus trophies\n\n{data['description']}",
-            colour=await ctx.embed_colour(),
-        )
-
-        embed.set_author(
-            name=f"{data['name']} ({data['tag']})",
-            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
-            icon_url=data["badgeUrls"]["small"],
-        )
-
-        embed.set_thumbnail(url=data["badgeUrls"]["large"])
-
-        tags = "\n".join(f"- {tag['name']}" for tag in data["labels"])
-
-        leader = ""
-        for member in data["memberList"]:
-            if member["role"] == "leader":
-                leader = member
-                break
-
-        tieslosses = ""
-
-        if data["isWarLogPublic"]:
-            tieslosses = f", {data['warLosses']} lost, {data['warTies']} ties"
-
-        embed.add_field(
-            name="__**Clan Info**__",
-            value=f"**Tags**\n{tags}\n\n**Clan Leader**\n[{leader['name']} ({leader['tag']})](https://link.clashofclans.com/en?action=OpenPlayerProfile&tag=%23{leader['tag'][1:]})\n\n**Location**\n{data['location']['name']}\n\n**Requirements**\n{'Invite Only' if data['type'] == 'inviteOnly' else 'Open'}\n{data['requiredTrophies']} trophies required\n{data['requiredVersusTrophies']} versus trophies required\nTownhall {data['requiredTownhallLevel']} required\n\n**War Log**\n{'Public' if data['isWarLogPublic'] else 'Private'}",
-        )
-
-        embed.add_field(
-            name="__**War and League**__",
-            value=f"**War League**\n{data['warLeague']['name']}\n**War Stats**\n{data['warWins']} won{tieslosses}\n**Win Streak**\n{data['warWinStreak']}",
-            inline=False,
+        embed = await self.cached_embed(
+            "clan", data, await ctx.embed_colour(), self.generate_clan_embed
         )
 
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self.mark_stale(embed, data))
 
     @clash.command(aliases=["members"])
     async def clanmembers(self, ctx, clanTag: Optional[TagConverter]):
@@ -406,7 +539,7 @@ class ClashOfClans(commands.Cog):
         **clanTag**, leaving this blank will show you your linked clan.
         """
 
-        tag = await self.config.user(ctx.author).clan()
+        tag = await self.linked_clan(ctx.author)
 
         if clanTag is None:
             if not tag:
@@ -438,7 +571,7 @@ class ClashOfClans(commands.Cog):
             url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
         )
 
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self.mark_stale(embed, data))
 
     @clash.command(aliases=["donations"])
     async def clandonations(self, ctx, clanTag: Optional[TagConverter]):
@@ -447,7 +580,7 @@ class ClashOfClans(commands.Cog):
         **clanTag**, leaving this blank will show you your linked clan.
         """
 
-        tag = await self.config.user(ctx.author).clan()
+        tag = await self.linked_clan(ctx.author)
 
         if clanTag is None:
             if not tag:
@@ -465,22 +598,13 @@ class ClashOfClans(commands.Cog):
         elif data == 404:
             return await ctx.send("Clan was not found.")
 
-        donation_data = {
-            member["donations"]: {
-                "name": member["name"],
-                "received": member["donationsReceived"],
-                "donated": member["donations"],
-            }
-            for member in data["memberList"]
-        }
-
-        sorted_keys = sorted(list(donation_data), reverse=True)
-
-        donation_description = ""
+        # A clan has at most 50 members, so they all fit on one page
+        board = Leaderboard.from_clans([data], "donations", per_page=50)
 
-        for position, key in enumerate(sorted_keys, start=1):
-            user_data = donation_data[key]
-            donation_description += f"{position}   {user_data['donated']}   {user_data['received']}   {user_data['name']}\n"
+        donation_description = "".join(
+            f"{position}   {member['donations']}   {member['donationsReceived']}   {member['name']}\n"
+            for position, _, member, _ in board.page(0)
+        )
 
         embed = discord.Embed(
             title="#    Don    Rec    Name",
@@ -492,26 +616,35 @@ class ClashOfClans(commands.Cog):
             url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
         )
 
-        await ctx.send(embed=embed)
+        await ctx.send(embed=self.mark_stale(embed, data))
 
-    @clash.command(aliases=["war"])
-    async def clanwar(self, ctx, clanTag: Optional[TagConverter]):
-        """Shows current war statistics of choosen clan.
+    @clash.command(aliases=["lb"])
+    async def leaderboard(
+        self,
+        ctx,
+        sort_by: str = "trophies",
+        clanTag: Optional[TagConverter] = None,
+    ):
+        """Ranks the members of a clan.
 
+        **sort_by**, one of donations, received, ratio, trophies or versustrophies.
         **clanTag**, leaving this blank will show you your linked clan.
         """
 
-        tag = await self.config.user(ctx.author).clan()
+        sort_by = sort_by.lower()
+
+        if sort_by not in SORT_KEYS:
+            return await ctx.send(f"You can sort by {', '.join(SORT_KEYS)}.")
 
         if clanTag is None:
-            if not tag:
+            clanTag = await self.linked_clan(ctx.author)
+
+            if not clanTag:
                 return await ctx.send(
                     f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
                 )
 
-            clanTag = tag
-
-        data = await self.request(f"clans/%23{clanTag}/currentwar")
+        data = await self.request(f"clans/%23{clanTag}")
 
         if not data:
             return await ctx.send(self.issue_response)
@@ -519,168 +652,949 @@ class ClashOfClans(commands.Cog):
         elif data == 404:
             return await ctx.send("Clan was not found.")
 
-        if data["state"] == "notInWar":
-            return await ctx.send("This clan is not currently in a war.")
-
-        embed = discord.Embed(colour=await ctx.embed_colour())
-        embed.set_author(
-            name=f"Current war of {data['clan']['name']}",
-            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
+        await self.send_leaderboard(
+            ctx,
+            Leaderboard.from_clans([data], sort_by),
+            f"{data['name']} ({data['tag']}) by {sort_by}",
+            data,
         )
 
-        opponent_data = data["opponent"]
+    @clash.command(aliases=["serverboard"])
+    @commands.guild_only()
+    async def guildleaderboard(self, ctx, sort_by: str = "trophies"):
+        """Ranks the members of every clan linked by someone in this server.
 
-        embed.add_field(
-            name="__**Opponent**__",
-            value=f"[{opponent_data['name']}({opponent_data['tag']})](https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{opponent_data['tag'][1:]})",
-            inline=False,
-        )
+        **sort_by**, one of donations, received, ratio, trophies or versustrophies.
+        """
 
-        state = data["state"]
+        sort_by = sort_by.lower()
 
-        timestamp = 0
+        if sort_by not in SORT_KEYS:
+            return await ctx.send(f"You can sort by {', '.join(SORT_KEYS)}.")
 
-        unformated_timestamp = (
-            data["startTime"] if state == "preparation" else data["endTime"]
-        )
-        timestamp = str(
-            datetime.strptime(unformated_timestamp, "%Y%m%dT%H%M%S.%fZ").timestamp()
-        )
+        await self.links.ready.wait()
 
-        state_text = f"{state.title()}\nTime until {'battle day' if state == 'preparation' else 'end of war'}: <t:{timestamp[:-2]}:R>"
+        tags = [
+            tag
+            for tag, users in self.links.clan_users.items()
+            if any(ctx.guild.get_member(user_id) for user_id in users)
+        ]
 
-        embed.add_field(
-            name="__**War Info**__",
-            value=f"**Team Size:** {data['teamSize']}\n**Attacks per Member:** {data['attacksPerMember']}\n\n**War State**\n{state_text}",
-        )
+        if not tags:
+            return await ctx.send("Nobody in this server has linked a clan.")
 
-        embed.add_field(
-            name="__**War Stats**__",
-            value=f"**Ally**\n{data['clan']['attacks']} Attacks\n{data['clan']['stars']} Stars\n{data['clan']['destructionPercentage']}% Destruction\n\n**Opponent**\n{data['opponent']['attacks']} Attacks\n{data['opponent']['stars']} Stars\n{data['opponent']['destructionPercentage']}% Destruction",
-            inline=False,
+        # Linked clans are usually cached already, thanks to prewarming
+        results = await self.fetch_many(f"clans/%23{tag}" for tag in tags)
+        clans = [data for data in results if data and data != 404]
+
+        if not clans:
+            return await ctx.send(self.issue_response)
+
+        await self.send_leaderboard(
+            ctx,
+            Leaderboard.from_clans(clans, sort_by),
+            f"{ctx.guild.name} by {sort_by}",
+            *clans,
         )
 
-        await ctx.send(embed=embed)
+    async def send_leaderboard(self, ctx, board: Leaderboard, title: str, *payloads):
+        embed_colour = await ctx.embed_colour()
 
-    @clash.command(aliases=["token"])
-    @commands.is_owner()
-    async def settoken(self, ctx, token: str):
-        """Sets the token required to make requests to the Clash of Clans API.
+        async def render(index: int) -> discord.Embed:
+            rows = "\n".join(
+                f"{position:<4}{value:<8}{member['name']}"
+                + (f" ({clan})" if clan else "")
+                for position, value, member, clan in board.page(index)
+            )
 
-        You can request one at [The Clash of Clans developer page](http://developer.clashofclans.com).
-        """
+            embed = discord.Embed(description=f"```{rows}```", colour=embed_colour)
+            embed.set_author(name=title)
+            embed.set_footer(text=f"Page {index + 1} of {board.pages}")
 
-        show_verified_text = True
+            return self.mark_stale(embed, *payloads)
 
-        await self.config.token.set(token)
-        await self.update_headers()
-        if ctx.channel.permissions_for(ctx.guild.me).manage_messages:
-            await ctx.message.delete()
-        else:
-            show_verified_text = False
+        if board.pages == 1:
+            return await ctx.send(embed=await render(0))
 
-        await ctx.send(
-            f"The authorization token has been updated. {'I have deleted your message to keep your token safe!' if show_verified_text else ''}"
-        )
+        # Members further down are only ranked when someone pages to them
+        await lazy_menu(ctx, LazyPages(board.pages, render))
 
-    @clash.command(aliases=["reset"])
-    @commands.is_owner()
-    async def resettoken(self, ctx):
-        """Resets your API token."""
+    @clash.command(aliases=["report"])
+    async def clanreport(self, ctx, clanTag: Optional[TagConverter]):
+        """Shows town halls, heroes, troops and war readiness across a whole clan.
 
-        msg = await ctx.send("Are you sure you want to reset your token?")
-        start_adding_reactions(msg, ReactionPredicate.YES_OR_NO_EMOJIS)
+        **clanTag**, leaving this blank will show you your linked clan.
+        """
 
-        pred = ReactionPredicate.yes_or_no(msg, ctx.author)
-        await ctx.bot.wait_for("reaction_add", check=pred)
+        tag = await self.linked_clan(ctx.author)
 
-        await msg.delete()
+        if clanTag is None:
+            if not tag:
+                return await ctx.send(
+                    f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
+                )
 
-        if not pred.result:
-            return await ctx.send("Reset cancelled, your token is still saved.")
+            clanTag = tag
 
-        await self.config.token.clear()
-        await ctx.tick()
+        data = await self.request(f"clans/%23{clanTag}")
 
-    @clash.command(aliases=["emoji"])
-    @commands.is_owner()
-    async def setemoji(self, ctx, emoji: discord.Emoji, *, emoji_name: EmojiConverter):
-        """Set an emoji for a certain troop or thing.
+        if not data:
+            return await ctx.send(self.issue_response)
 
-        Check `[p]clash emojis` for what emojis you can set.
-        """
+        elif data == 404:
+            return await ctx.send("Clan was not found.")
 
-        async with self.config.emojis() as emojis:
-            emojis[emoji_name] = emoji.id
+        async with ctx.typing():
+            results = await self.fetch_many(
+                f"players/%23{member['tag'][1:]}" for member in data["memberList"]
+            )
 
-        await self.generate_emojis()
-        await ctx.send(f"You have set the emoji {emoji} to {emoji_name}")
+        players = [player for player in results if player and player != 404]
 
-    @clash.command(aliases=["emojis"])
-    @commands.is_owner()
-    async def listemojis(self, ctx):
-        """List all of the things you can set emojis to."""
+        if not players:
+            return await ctx.send(self.issue_response)
+
+        summary = summarize_members(players)
 
-        emojis = " ".join(f"`{emoji.title()}`" for emoji in self.emojis.keys())
         embed = discord.Embed(
-            title="These are all of the emoji options",
-            description=emojis,
+            description=f"**Based on {summary['members']} of {len(data['memberList'])} members**",
             colour=await ctx.embed_colour(),
         )
-        await ctx.send(embed=embed)
+        embed.set_author(
+            name=f"Report for {data['name']} ({data['tag']})",
+            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
+            icon_url=data["badgeUrls"]["small"],
+        )
 
-    @commands.group(name="account")
-    async def account(self, ctx):
-        """The group for account linking commands."""
+        embed.add_field(
+            name="__**Town Halls**__",
+            value="\n".join(
+                f"**TH {level}** {count}"
+                for level, count in summary["townhalls"].items()
+            ),
+        )
 
-    @account.command()
-    @commands.check(has_account)
-    async def list(self, ctx, user: discord.User = None):
-        """View all of yours or someone elses clash accounts linked to their Discord account."""
+        if summary["heroes"]:
+            embed.add_field(
+                name="__**Heroes**__",
+                value="\n".join(
+                    f"**{self.get_emoji(name)}** {hero['average']:.1f}/{hero['max']} avg, {hero['unlocked']} unlocked"
+                    for name, hero in summary["heroes"].items()
+                ),
+            )
 
-        if user is None:
-            user = ctx.author
+        embed.add_field(
+            name="__**Troops**__",
+            value=f"**Average Maxed**\n{summary['troops_maxed']:.0%}\n**Fully Maxed Members**\n{summary['fully_maxed']}",
+            inline=False,
+        )
+
+        embed.add_field(
+            name="__**War Readiness**__",
+            value=f"**Opted In**\n{summary['war_ready']}/{summary['members']} ({summary['war_ready'] / summary['members']:.0%})\n**Average Opted In Town Hall**\n{summary['war_ready_townhall']:.1f}",
+            inline=False,
+        )
 
-        user_data = await self.config.user(user).all()
+        await ctx.send(embed=self.mark_stale(embed, data, *players))
 
-        account_text = ""
-        for tag in user_data["accounts"]:
-            data = await self.request(f"players/%23{tag}")
+    @clash.command(aliases=["donors"])
+    async def topdonors(self, ctx, clanTag: Optional[TagConverter], days: int = 7):
+        """Shows who donated the most over the last few days.
 
-            if not data or data == 404:
-                continue
+        Only clans someone has linked have their history recorded.
 
-            account_text += f"[{data['name']} ({data['tag']})](https://link.clashofclans.com/en?action=OpenPlayerProfile&tag=%23{tag})\n\n"
+        **clanTag**, leaving this blank will show you your linked clan.
+        **days**, how far back to look, defaults to a week.
+        """
 
-        if not account_text:
-            return await ctx.send("This user has no accounts connected to them.")
+        if clanTag is None:
+            clanTag = await self.linked_clan(ctx.author)
 
-        embed = discord.Embed(colour=await ctx.embed_colour())
-        embed.set_author(
-            name=f"{user.name} Connected Accounts", icon_url=user.avatar_url
-        )
+            if not clanTag:
+                return await ctx.send(
+                    f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
+                )
 
-        if user_data["clan"]:
-            clan_data = await self.request(f"clans/%23{user_data['clan']}")
+        donors = self.history.top_donors(clanTag, time.time() - days * 86400)
 
-            if not clan_data:
-                return await ctx.send(self.issue_response)
+        if not donors:
+            return await ctx.send("There is no history recorded for this clan yet.")
 
-            elif data == 404:
-                return await ctx.send("Clan was not found.")
+        donors.sort(key=lambda donor: donor[1], reverse=True)
 
-            embed.add_field(
-                name="Clan",
-                value=f"[{clan_data['name']} ({clan_data['tag']})](https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clan_data['tag']})",
-                inline=False,
-            )
+        text = "\n".join(
+            f"**{name}** {self.millify(donated)} donated, {self.millify(received)} received"
+            for name, donated, received in donors[:10]
+        )
 
-        embed.add_field(name="Accounts", value=account_text, inline=False)
+        embed = discord.Embed(description=text, colour=await ctx.embed_colour())
+        embed.set_author(name=f"Top donors of #{clanTag}")
+        embed.set_footer(text=f"Last {days} days")
 
         await ctx.send(embed=embed)
 
-    @account.command()
-    async def link(self, ctx, tag: TagConverter):
+    @clash.command()
+    async def trend(
+        self,
+        ctx,
+        playerTag: Optional[TagConverter],
+        metric: str = "trophies",
+        days: int = 7,
+    ):
+        """Shows how a player's trophies or donations changed over time.
+
+        Only members of clans someone has linked have their history recorded.
+
+        **playerTag**, leaving this blank will show you your first linked account.
+        **metric**, one of donations, received or trophies.
+        **days**, how far back to look, defaults to a week.
+        """
+
+        metric = metric.lower()
+
+        if metric not in METRICS:
+            return await ctx.send(f"The metric must be one of {', '.join(METRICS)}.")
+
+        if playerTag is None:
+            tags = await self.linked_accounts(ctx.author)
+
+            if not tags:
+                return await ctx.send(
+                    f"Please enter a valid player tag or link your account using `{ctx.prefix}account link`."
+                )
+
+            playerTag = tags[0]
+
+        trend = self.history.trend(playerTag, metric, time.time() - days * 86400)
+
+        if trend is None or not trend[1]:
+            return await ctx.send("There is no history recorded for this player yet.")
+
+        series, times, values = trend
+
+        embed = discord.Embed(
+            description=f"**{values[0]}** → **{values[-1]}** ({values[-1] - values[0]:+})\n\n{sparkline(values)}",
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(name=f"{series.name} (#{playerTag}) {metric}")
+        embed.set_footer(text=f"{len(values)} points over the last {days} days")
+
+        await ctx.send(embed=embed)
+
+    @clash.command(aliases=["war"])
+    async def clanwar(self, ctx, clanTag: Optional[TagConverter]):
+        """Shows current war statistics of choosen clan.
+
+        **clanTag**, leaving this blank will show you your linked clan.
+        """
+
+        tag = await self.linked_clan(ctx.author)
+
+        if clanTag is None:
+            if not tag:
+                return await ctx.send(
+                    f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
+                )
+
+            clanTag = tag
+
+        data = await self.request(f"clans/%23{clanTag}/currentwar")
+
+        if not data:
+            return await ctx.send(self.issue_response)
+
+        elif data == 404:
+            return await ctx.send("Clan was not found.")
+
+        if data["state"] == "notInWar":
+            return await ctx.send("This clan is not currently in a war.")
+
+        embed = await self.cached_embed(
+            "clanwar", data, await ctx.embed_colour(), self.generate_war_embed
+        )
+
+        await ctx.send(embed=self.mark_stale(embed, data))
+
+    @clash.group()
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    async def warwatch(self, ctx):
+        """Post live updates of clan wars to a channel."""
+
+    @warwatch.command(name="add")
+    async def warwatch_add(
+        self, ctx, clanTag: TagConverter, channel: discord.TextChannel = None
+    ):
+        """Post new attacks and war state changes of a clan to a channel.
+
+        **channel**, leaving this blank will use the current channel.
+        """
+
+        channel = channel or ctx.channel
+
+        data = await self.request(f"clans/%23{clanTag}")
+
+        if not data:
+            return await ctx.send(self.issue_response)
+
+        elif data == 404:
+            return await ctx.send("Clan was not found.")
+
+        async with self.config.guild(ctx.guild).war_watch() as watches:
+            previous = watches.get(clanTag)
+            watches[clanTag] = channel.id
+
+        if previous is not None:
+            self.warwatcher.unwatch(clanTag, previous)
+
+        self.warwatcher.watch(clanTag, channel.id)
+
+        await ctx.send(
+            f"Wars of **{data['name']}** will now be posted in {channel.mention}."
+        )
+
+    @warwatch.command(name="remove")
+    async def warwatch_remove(self, ctx, clanTag: TagConverter):
+        """Stop posting the wars of a clan."""
+
+        async with self.config.guild(ctx.guild).war_watch() as watches:
+            channel_id = watches.pop(clanTag, None)
+
+        if channel_id is None:
+            return await ctx.send("That clan's wars aren't being posted here.")
+
+        self.warwatcher.unwatch(clanTag, channel_id)
+
+        await ctx.send(f"Wars of `#{clanTag}` will no longer be posted.")
+
+    @warwatch.command(name="list")
+    async def warwatch_list(self, ctx):
+        """See which clans have their wars posted in this server."""
+
+        watches = await self.config.guild(ctx.guild).war_watch()
+
+        if not watches:
+            return await ctx.send("No clans have their wars posted in this server.")
+
+        embed = discord.Embed(
+            description="\n".join(
+                f"`#{tag}` in <#{channel_id}>" for tag, channel_id in watches.items()
+            ),
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(name="Watched Wars")
+
+        await ctx.send(embed=embed)
+
+    @clash.group(name="roles")
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_roles=True)
+    async def roles(self, ctx):
+        """Give roles based on linked town halls, clans and clan ranks."""
+
+    async def set_sync_role(self, ctx, kind: str, key: str, role: discord.Role):
+        if role >= ctx.guild.me.top_role:
+            return await ctx.send("That role is above my highest role.")
+
+        async with self.config.guild(ctx.guild).role_sync() as settings:
+            settings[kind][key] = role.id
+
+        await ctx.send(
+            f"{role.name} will now be synced. Run `{ctx.prefix}clash roles sync` to sync it now."
+        )
+
+    @roles.command(name="townhall", aliases=["th"])
+    async def roles_townhall(self, ctx, level: int, *, role: discord.Role):
+        """Give a role to members whose highest town hall is this level."""
+
+        if level not in self.townhalls:
+            return await ctx.send("That isn't a valid town hall level.")
+
+        await self.set_sync_role(ctx, "townhall", str(level), role)
+
+    @roles.command(name="clan")
+    async def roles_clan(self, ctx, clanTag: TagConverter, *, role: discord.Role):
+        """Give a role to members with an account in this clan."""
+
+        data = await self.request(f"clans/%23{clanTag}")
+
+        if not data:
+            return await ctx.send(self.issue_response)
+
+        elif data == 404:
+            return await ctx.send("Clan was not found.")
+
+        await self.set_sync_role(ctx, "clan", data["tag"][1:], role)
+
+    @roles.command(name="rank")
+    async def roles_rank(self, ctx, rank: str, *, role: discord.Role):
+        """Give a role to members with this rank in their clan.
+
+        **rank**, one of member, elder, coleader or leader.
+        """
+
+        rank = RANK_NAMES.get(rank.lower().replace("-", ""))
+
+        if rank is None:
+            return await ctx.send(f"The rank must be one of {', '.join(RANK_NAMES)}.")
+
+        await self.set_sync_role(ctx, "rank", rank, role)
+
+    @roles.command(name="remove")
+    async def roles_remove(self, ctx, *, role: discord.Role):
+        """Stop syncing a role, members keep it until it's removed by hand."""
+
+        removed = False
+
+        async with self.config.guild(ctx.guild).role_sync() as settings:
+            for mapping in settings.values():
+                for key, role_id in list(mapping.items()):
+                    if role_id == role.id:
+                        del mapping[key]
+                        removed = True
+
+        if not removed:
+            return await ctx.send("That role isn't being synced.")
+
+        await ctx.send(f"{role.name} will no longer be synced.")
+
+    @roles.command(name="list")
+    async def roles_list(self, ctx):
+        """See which roles are synced in this server."""
+
+        settings = await self.config.guild(ctx.guild).role_sync()
+
+        names = {"townhall": "Town Hall {}", "clan": "Clan #{}", "rank": "Rank {}"}
+
+        text = "\n".join(
+            f"{names[kind].format(key)}: <@&{role_id}>"
+            for kind, mapping in settings.items()
+            for key, role_id in mapping.items()
+        )
+
+        if not text:
+            return await ctx.send("No roles are synced in this server.")
+
+        embed = discord.Embed(description=text, colour=await ctx.embed_colour())
+        embed.set_author(name="Synced Roles")
+
+        await ctx.send(embed=embed)
+
+    @roles.command(name="sync")
+    @commands.bot_has_permissions(manage_roles=True)
+    async def roles_sync(self, ctx):
+        """Sync roles now instead of waiting for the next hourly sync."""
+
+        if ctx.guild.id in self.rolesync.running:
+            return await ctx.send("Roles are already being synced in this server.")
+
+        settings = await self.config.guild(ctx.guild).role_sync()
+
+        async with ctx.typing():
+            stats = await self.rolesync.sync_guild(ctx.guild, settings)
+
+        await ctx.send(
+            f"Checked {stats['checked']} members, added {stats['added']} roles and removed {stats['removed']}."
+            + (
+                f" {stats['skipped']} members were skipped as their accounts couldn't be fetched."
+                if stats["skipped"]
+                else ""
+            )
+        )
+
+    @clash.command(aliases=["find"])
+    async def search(
+        self,
+        ctx,
+        name: str,
+        minMembers: Optional[int] = None,
+        *,
+        location: str = None,
+    ):
+        """Search for clans by name.
+
+        **name**, at least 3 characters, use quotes if it has spaces.
+        **minMembers**, only show clans with at least this many members.
+        **location**, only show clans from this country or region.
+        """
+
+        if len(name) < 3:
+            return await ctx.send("The name must be at least 3 characters long.")
+
+        location_id = None
+
+        if location:
+            location_id = await self.find_location(location)
+
+            if location_id is False:
+                return await ctx.send(self.issue_response)
+
+            elif location_id is None:
+                return await ctx.send(f"`{location}` is not a valid location.")
+
+        results = self.search_clans(
+            name=name,
+            location_id=location_id,
+            min_members=minMembers,
+            max_results=self.MAX_SEARCH_RESULTS,
+        )
+        embed_colour = await ctx.embed_colour()
+
+        def render(index: int, clans: List[Dict], last: bool) -> discord.Embed:
+            embed = discord.Embed(
+                description="\n\n".join(
+                    f"[**{clan['name']} ({clan['tag']})**](https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clan['tag'][1:]})\nLevel {clan['clanLevel']}, {clan['members']}/50 members, {clan['requiredTrophies']} trophies required, {clan.get('location', {}).get('name', 'No location')}"
+                    for clan in clans
+                )
+                or "No clans were found.",
+                colour=embed_colour,
+            )
+            embed.set_author(name=f"Clans matching {name}")
+            embed.set_footer(text=f"Page {index + 1}{'' if last else ' of many'}")
+
+            return embed
+
+        await lazy_menu(ctx, StreamPages(results, self.SEARCH_PAGE_SIZE, render))
+
+    @clash.command(aliases=["league"])
+    async def cwl(self, ctx, clanTag: Optional[TagConverter]):
+        """Shows the Clan War League standings of choosen clan's group.
+
+        **clanTag**, leaving this blank will show you your linked clan.
+        """
+
+        tag = await self.linked_clan(ctx.author)
+
+        if clanTag is None:
+            if not tag:
+                return await ctx.send(
+                    f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
+                )
+
+            clanTag = tag
+
+        group = await self.request(group_endpoint(clanTag))
+
+        if group == 404:
+            return await ctx.send("This clan is not currently in a Clan War League.")
+
+        elif not group:
+            return await ctx.send(self.issue_response)
+
+        # Finished wars are cached forever, so only live ones are actually requested
+        async with ctx.typing():
+            wars = await self.fetch_many(
+                war_endpoint(war_tag) for war_tag in war_tags(group)
+            )
+
+        wars = [war for war in wars if war and war != 404]
+
+        standings = compute_standings(group, wars)
+
+        text = "\n".join(
+            f"{position}. **{clan['name']}** {clan['stars']} ⭐ {clan['destruction']:.0f}% ({clan['wins']}W {clan['losses']}L {clan['ties']}T)"
+            for position, clan in enumerate(standings, start=1)
+        )
+
+        embed = discord.Embed(
+            description=f"**Season {group['season']}, Round {current_round(group)} of {len(group['rounds'])}**\n\n{text}",
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(
+            name=f"Clan War League of #{clanTag}",
+            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clanTag}",
+        )
+
+        await ctx.send(embed=self.mark_stale(embed, group, *wars))
+
+    @clash.command(aliases=["token"])
+    @commands.is_owner()
+    async def settoken(self, ctx, token: str):
+        """Sets the token required to make requests to the Clash of Clans API.
+
+        You can request one at [The Clash of Clans developer page](http://developer.clashofclans.com).
+        """
+
+        show_verified_text = True
+
+        await self.config.token.set(token)
+        await self.update_tokens()
+        if ctx.channel.permissions_for(ctx.guild.me).manage_messages:
+            await ctx.message.delete()
+        else:
+            show_verified_text = False
+
+        await ctx.send(
+            f"The authorization token has been updated. {'I have deleted your message to keep your token safe!' if show_verified_text else ''}"
+        )
+
+    @clash.command(aliases=["reset"])
+    @commands.is_owner()
+    async def resettoken(self, ctx):
+        """Resets your API token."""
+
+        msg = await ctx.send("Are you sure you want to reset your token?")
+        start_adding_reactions(msg, ReactionPredicate.YES_OR_NO_EMOJIS)
+
+        pred = ReactionPredicate.yes_or_no(msg, ctx.author)
+        await ctx.bot.wait_for("reaction_add", check=pred)
+
+        await msg.delete()
+
+        if not pred.result:
+            return await ctx.send("Reset cancelled, your token is still saved.")
+
+        await self.config.token.clear()
+        await self.config.tokens.clear()
+        await self.update_tokens()
+
+        await ctx.tick()
+
+    @clash.command()
+    @commands.is_owner()
+    async def addtoken(self, ctx, token: str):
+        """Adds an extra token, requests are spread over all of your tokens.
+
+        Each token has its own rate limit, so more tokens means more requests.
+        """
+
+        async with self.config.tokens() as tokens:
+            if token not in tokens:
+                tokens.append(token)
+
+        await self.update_tokens()
+
+        if ctx.guild and ctx.channel.permissions_for(ctx.guild.me).manage_messages:
+            await ctx.message.delete()
+
+        await ctx.send(
+            f"The token has been added. There are now {len(self.keys)} tokens."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def removetoken(self, ctx, number: int):
+        """Removes an extra token, see `[p]clash tokens` for the numbers."""
+
+        async with self.config.tokens() as tokens:
+            if not 0 < number <= len(tokens):
+                return await ctx.send("There is no extra token with that number.")
+
+            tokens.pop(number - 1)
+
+        await self.update_tokens()
+        await ctx.tick()
+
+    @clash.command()
+    @commands.is_owner()
+    async def tokens(self, ctx):
+        """Lists your tokens and how they are doing."""
+
+        main_token = await self.config.token()
+        extra_tokens = await self.config.tokens()
+
+        if not main_token and not extra_tokens:
+            return await ctx.send("You have not set any tokens.")
+
+        keys = {key.token: key for key in self.keys.keys}
+
+        def describe(token):
+            key = keys[token]
+            return f"`{key.masked}` {'Suspended' if key.suspended else 'Active'}, {key.inflight} in flight"
+
+        text = f"**Main**\n{describe(main_token) if main_token else 'Not set'}"
+
+        if extra_tokens:
+            text += "\n\n**Extra**\n" + "\n".join(
+                f"{number}. {describe(token)}"
+                for number, token in enumerate(extra_tokens, start=1)
+            )
+
+        embed = discord.Embed(description=text, colour=await ctx.embed_colour())
+        embed.set_author(name=f"API Tokens ({self.keys.strategy})")
+
+        await ctx.send(embed=embed)
+
+    @clash.command()
+    @commands.is_owner()
+    async def setkeystrategy(self, ctx, strategy: str):
+        """Sets how requests are spread over your tokens.
+
+        **strategy**, either `roundrobin` or `leastloaded`.
+        """
+
+        strategy = strategy.lower()
+
+        if strategy not in STRATEGIES:
+            return await ctx.send(
+                f"The strategy must be one of {', '.join(f'`{s}`' for s in STRATEGIES)}."
+            )
+
+        await self.config.key_strategy.set(strategy)
+        self.keys.strategy = strategy
+
+        await ctx.send(
+            f"Requests will now be spread over your tokens using `{strategy}`."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def cachestats(self, ctx):
+        """Shows how well the API response cache is doing."""
+
+        stats = self.cache.stats()
+
+        embed = discord.Embed(
+            description=f"**Entries**\n{stats['size']}/{stats['maxsize']}\n**Hits**\n{stats['hits']}\n**Misses**\n{stats['misses']}\n**Stale Hits**\n{stats['stale_hits']}\n**Hit Ratio**\n{stats['hit_ratio']:.1%}\n**Rendered Embeds**\n{len(self.embeds)} cached, {self.embeds.hits} hits, {self.embeds.misses} misses",
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(name="API Response Cache")
+
+        await ctx.send(embed=embed)
+
+    @clash.command()
+    @commands.is_owner()
+    async def setconcurrency(self, ctx, limit: int):
+        """Sets how many API requests a single command can make at once.
+
+        This is used when looking up every linked account of a user.
+        """
+
+        if limit < 1:
+            return await ctx.send("The limit must be at least 1.")
+
+        await self.config.concurrency.set(limit)
+        await ctx.send(f"Commands will now make at most {limit} requests at once.")
+
+    @clash.command()
+    @commands.is_owner()
+    async def setratelimit(self, ctx, requests_per_second: float):
+        """Sets how many requests per second can be made with each token.
+
+        Requests over this limit are queued instead of failing.
+        """
+
+        if requests_per_second <= 0:
+            return await ctx.send("The rate limit must be more than 0.")
+
+        await self.config.rate_limit.set(requests_per_second)
+        self.keys.set_rate(requests_per_second)
+
+        await ctx.send(
+            f"Requests to the API are now limited to {requests_per_second} per second for each token."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def setconnection(self, ctx, setting: str = None, value: float = None):
+        """Sets how connections to the API are made.
+
+        Leave both blank to see the current settings.
+
+        **setting**, one of `limit`, `limit_per_host`, `keepalive_timeout`, `ttl_dns_cache`, `connect_timeout` or `read_timeout`. Times are in seconds.
+        """
+
+        settings = await self.config.connection()
+
+        if setting is None:
+            text = "\n".join(f"**{name}** {value}" for name, value in settings.items())
+            embed = discord.Embed(description=text, colour=await ctx.embed_colour())
+            embed.set_author(name="Connection Settings")
+
+            return await ctx.send(embed=embed)
+
+        setting = setting.lower()
+
+        if setting not in settings:
+            return await ctx.send(f"`{setting}` is not a connection setting.")
+
+        if value is None or value < 0:
+            return await ctx.send("Please give a value of 0 or more.")
+
+        if setting in ("limit", "limit_per_host"):
+            # 0 means no limit for aiohttp
+            value = int(value)
+
+        await self.config.connection.set_raw(setting, value=value)
+        self.scheduler.set_slots(await self.request_slots())
+
+        if self.session:
+            # The next request will make a new session with the new settings
+            await self.session.close()
+            self.session = None
+
+        await ctx.send(f"`{setting}` has been set to {value}.")
+
+    @clash.command()
+    @commands.is_owner()
+    async def prewarm(self, ctx, enabled: bool):
+        """Toggles keeping linked clans and their wars refreshed in the background.
+
+        This makes clan commands faster at the cost of using more of your API quota.
+        """
+
+        await self.config.prewarm.set(enabled)
+        await ctx.send(
+            f"Linked clans will {'now' if enabled else 'no longer'} be refreshed in the background."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def prewarmbudget(self, ctx, requests_per_minute: int):
+        """Sets how many requests a minute can be used to refresh linked clans."""
+
+        if requests_per_minute < 2:
+            return await ctx.send("The budget must be at least 2 requests a minute.")
+
+        await self.config.prewarm_budget.set(requests_per_minute)
+        await ctx.send(
+            f"Background refreshing will now use at most {requests_per_minute} requests a minute."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def servestale(self, ctx, enabled: bool):
+        """Toggles answering with expired cached data while it is refreshed.
+
+        The last good data is also used when the API is having issues. Embeds show how old the data is.
+        """
+
+        await self.config.serve_stale.set(enabled)
+        self.serve_stale = enabled
+
+        await ctx.send(
+            f"Expired data will {'now' if enabled else 'no longer'} be used while it is refreshed."
+        )
+
+    @clash.command()
+    @commands.is_owner()
+    async def metrics(self, ctx, output_format: str = None):
+        """Shows how requests to the API are performing.
+
+        **output_format**, leave blank for a summary or use `json` or `prometheus` to get a file.
+        """
+
+        if output_format:
+            output_format = output_format.lower()
+
+            if output_format == "json":
+                text = json.dumps(self.api_metrics.to_dict(self.cache), indent=4)
+                filename = "metrics.json"
+            elif output_format == "prometheus":
+                text = self.api_metrics.to_prometheus(self.cache)
+                filename = "metrics.txt"
+            else:
+                return await ctx.send("The format must be `json` or `prometheus`.")
+
+            return await ctx.send(
+                file=discord.File(io.BytesIO(text.encode()), filename=filename)
+            )
+
+        data = self.api_metrics.to_dict(self.cache)
+
+        embed = discord.Embed(
+            description=f"**Circuit** {self.breaker.state.title()}\n**In Flight** {len(self.inflight)}\n**Waiting** {self.scheduler.waiting()}\n**Shed** {self.scheduler.shed}\n**Cache Hit Ratio** {data['cache']['hit_ratio']:.1%}",
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(name="API Metrics")
+
+        for family, stats in data["families"].items():
+            statuses = ", ".join(
+                f"{status}: {count}" for status, count in stats["statuses"].items()
+            )
+            embed.add_field(
+                name=f"__**{family.title()}**__",
+                value=f"**Requests** {stats['requests']}\n**Statuses** {statuses or 'None'}\n**p50/p99** {format_latency(stats['latency']['p50'])}/{format_latency(stats['latency']['p99'])}\n**Bytes** {self.millify(stats['bytes'])}\n**Cache Hit Ratio** {stats['cache_hit_ratio']:.1%}",
+            )
+
+        await ctx.send(embed=embed)
+
+    @clash.command(aliases=["emoji"])
+    @commands.is_owner()
+    async def setemoji(self, ctx, emoji: discord.Emoji, *, emoji_name: EmojiConverter):
+        """Set an emoji for a certain troop or thing.
+
+        Check `[p]clash emojis` for what emojis you can set.
+        """
+
+        async with self.config.emojis() as emojis:
+            emojis[emoji_name] = emoji.id
+
+        await self.generate_emojis()
+        await ctx.send(f"You have set the emoji {emoji} to {emoji_name}")
+
+    @clash.command(aliases=["emojis"])
+    @commands.is_owner()
+    async def listemojis(self, ctx):
+        """List all of the things you can set emojis to."""
+
+        emojis = " ".join(f"`{emoji.title()}`" for emoji in self.emojis.keys())
+        embed = discord.Embed(
+            title="These are all of the emoji options",
+            description=emojis,
+            colour=await ctx.embed_colour(),
+        )
+        await ctx.send(embed=embed)
+
+    @commands.group(name="account")
+    async def account(self, ctx):
+        """The group for account linking commands."""
+
+    @account.command()
+    @commands.check(has_account)
+    async def list(self, ctx, user: discord.User = None):
+        """View all of yours or someone elses clash accounts linked to their Discord account."""
+
+        if user is None:
+            user = ctx.author
+
+        user_data = {
+            "accounts": await self.linked_accounts(user),
+            "clan": await self.linked_clan(user),
+        }
+
+        account_text = ""
+        clan_data = None
+
+        results = await self.fetch_many(
+            f"players/%23{tag}" for tag in user_data["accounts"]
+        )
+
+        for tag, data in zip(user_data["accounts"], results):
+            if not data or data == 404:
+                continue
+
+            account_text += f"[{data['name']} ({data['tag']})](https://link.clashofclans.com/en?action=OpenPlayerProfile&tag=%23{tag})\n\n"
+
+        if not account_text:
+            return await ctx.send("This user has no accounts connected to them.")
+
+        embed = discord.Embed(colour=await ctx.embed_colour())
+        embed.set_author(
+            name=f"{user.name} Connected Accounts", icon_url=user.avatar_url
+        )
+
+        if user_data["clan"]:
+            clan_data = await self.request(f"clans/%23{user_data['clan']}")
+
+            if not clan_data:
+                return await ctx.send(self.issue_response)
+
+            elif clan_data == 404:
+                return await ctx.send("Clan was not found.")
+
+            embed.add_field(
+                name="Clan",
+                value=f"[{clan_data['name']} ({clan_data['tag']})](https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{clan_data['tag']})",
+                inline=False,
+            )
+
+        embed.add_field(name="Accounts", value=account_text, inline=False)
+
+        await ctx.send(embed=self.mark_stale(embed, clan_data, *results))
+
+    @account.command()
+    async def link(self, ctx, tag: TagConverter):
         """Link your Clash of clans account to your Discord account."""
 
         data = await self.request(f"players/%23{tag}")
@@ -693,6 +1607,8 @@ class ClashOfClans(commands.Cog):
         async with self.config.user(ctx.author).accounts() as tags:
             tags.append(tag)
 
+        self.links.link(ctx.author.id, tag)
+
         await ctx.send(f"Your Discord account has been linked with **{data['name']}**.")
 
     @account.command()
@@ -709,6 +1625,8 @@ class ClashOfClans(commands.Cog):
         async with self.config.user(ctx.author).accounts() as tags:
             tags.remove(tag)
 
+        self.links.unlink(ctx.author.id, tag)
+
         await ctx.send(
             f"Your Discord account has been unlinked from **{data['name']}**."
         )
@@ -717,7 +1635,7 @@ class ClashOfClans(commands.Cog):
     async def linkclan(self, ctx, tag: TagConverter):
         """Link your Clash of clans clan to your Discord account."""
 
-        playerTag = await self.config.user(ctx.author).accounts()
+        playerTag = await self.linked_accounts(ctx.author)
 
         if not playerTag:
             return await ctx.send("You don't have an account linked.")
@@ -737,6 +1655,7 @@ class ClashOfClans(commands.Cog):
             return await ctx.send("You are not in this clan.")
 
         await self.config.user(ctx.author).clan.set(tag)
+        self.links.link_clan(ctx.author.id, tag)
 
         await ctx.send(f"Your Discord account has been linked to **{clan['name']}**.")
 
@@ -752,11 +1671,183 @@ class ClashOfClans(commands.Cog):
             return await ctx.send("Clan was not found.")
 
         await self.config.user(ctx.author).clan.clear()
+        self.links.unlink_clan(ctx.author.id)
 
         await ctx.send(
             f"Your Discord account has been unlinked from **{data['name']}**."
         )
 
+    @account.command()
+    @commands.guild_only()
+    async def owner(self, ctx, tag: TagConverter):
+        """See who in this server has linked a Clash of clans account."""
+
+        await self.links.ready.wait()
+
+        members = self.linked_members(ctx.guild, self.links.owners(tag))
+
+        if not members:
+            return await ctx.send(f"Nobody in this server has linked `#{tag}`.")
+
+        await ctx.send(
+            f"`#{tag}` is linked by {', '.join(member.mention for member in members)}.",
+            allowed_mentions=discord.AllowedMentions.none(),
+        )
+
+    @account.command(aliases=["inclan"])
+    @commands.guild_only()
+    async def linked(self, ctx, clanTag: Optional[TagConverter]):
+        """See who in this server has linked a clan.
+
+        **clanTag**, leaving this blank will show you your linked clan.
+        """
+
+        if clanTag is None:
+            clanTag = await self.linked_clan(ctx.author)
+
+            if not clanTag:
+                return await ctx.send(
+                    f"Please enter a valid clan tag or link your clan using `{ctx.prefix}account linkclan`."
+                )
+
+        await self.links.ready.wait()
+
+        members = self.linked_members(ctx.guild, self.links.members(clanTag))
+
+        if not members:
+            return await ctx.send(f"Nobody in this server has linked `#{clanTag}`.")
+
+        embed = discord.Embed(
+            description="\n".join(member.mention for member in members)[:4000],
+            colour=await ctx.embed_colour(),
+        )
+        embed.set_author(name=f"Members linked to #{clanTag}")
+        embed.set_footer(text=f"{len(members)} members")
+
+        await ctx.send(embed=embed)
+
+    async def linked_accounts(self, user: discord.abc.User) -> List[str]:
+        """The user's account tags, from the link index instead of config."""
+
+        await self.links.ready.wait()
+
+        return list(self.links.accounts.get(user.id, []))
+
+    async def linked_clan(self, user: discord.abc.User) -> Optional[str]:
+        await self.links.ready.wait()
+
+        return self.links.clans.get(user.id)
+
+    def linked_members(
+        self, guild: discord.Guild, user_ids: Iterable[int]
+    ) -> List[discord.Member]:
+        members = (guild.get_member(user_id) for user_id in user_ids)
+
+        return sorted(
+            (member for member in members if member), key=lambda m: m.display_name
+        )
+
+    async def cached_embed(
+        self, kind: str, data: Dict, embed_colour: discord.Colour, generate
+    ) -> discord.Embed:
+        """Returns the embed ``generate`` makes for the data, rendering it once."""
+
+        key = self.embeds.key(kind, data, embed_colour)
+        embed = self.embeds.get(key) if key else None
+
+        if embed is None:
+            embed = await generate(data, embed_colour)
+
+            if key:
+                self.embeds.set(key, embed)
+
+        return embed
+
+    async def generate_clan_embed(
+        self, data: Dict, embed_colour: discord.Colour
+    ) -> discord.Embed:
+        embed = discord.Embed(
+            description=f"**Level {data['clanLevel']}, Members {data['members']}, {data['clanPoints']} Trophies, {data['clanVersusPoints']} versus trophies\n\n{data['description']}",
+            colour=embed_colour,
+        )
+
+        embed.set_author(
+            name=f"{data['name']} ({data['tag']})",
+            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{data['tag'][1:]}",
+            icon_url=data["badgeUrls"]["small"],
+        )
+
+        embed.set_thumbnail(url=data["badgeUrls"]["large"])
+
+        tags = "\n".join(f"- {tag['name']}" for tag in data["labels"])
+
+        leader = ""
+        for member in data["memberList"]:
+            if member["role"] == "leader":
+                leader = member
+                break
+
+        tieslosses = ""
+
+        if data["isWarLogPublic"]:
+            tieslosses = f", {data['warLosses']} lost, {data['warTies']} ties"
+
+        embed.add_field(
+            name="__**Clan Info**__",
+            value=f"**Tags**\n{tags}\n\n**Clan Leader**\n[{leader['name']} ({leader['tag']})](https://link.clashofclans.com/en?action=OpenPlayerProfile&tag=%23{leader['tag'][1:]})\n\n**Location**\n{data['location']['name']}\n\n**Requirements**\n{'Invite Only' if data['type'] == 'inviteOnly' else 'Open'}\n{data['requiredTrophies']} trophies required\n{data['requiredVersusTrophies']} versus trophies required\nTownhall {data['requiredTownhallLevel']} required\n\n**War Log**\n{'Public' if data['isWarLogPublic'] else 'Private'}",
+        )
+
+        embed.add_field(
+            name="__**War and League**__",
+            value=f"**War League**\n{data['warLeague']['name']}\n**War Stats**\n{data['warWins']} won{tieslosses}\n**Win Streak**\n{data['warWinStreak']}",
+            inline=False,
+        )
+
+        return embed
+
+    async def generate_war_embed(
+        self, data: Dict, embed_colour: discord.Colour
+    ) -> discord.Embed:
+        embed = discord.Embed(colour=embed_colour)
+        embed.set_author(
+            name=f"Current war of {data['clan']['name']}",
+            url=f"https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{data['clan']['tag'][1:]}",
+        )
+
+        opponent_data = data["opponent"]
+
+        embed.add_field(
+            name="__**Opponent**__",
+            value=f"[{opponent_data['name']}({opponent_data['tag']})](https://link.clashofclans.com/en?action=OpenClanProfile&tag=%23{opponent_data['tag'][1:]})",
+            inline=False,
+        )
+
+        state = data["state"]
+
+        timestamp = 0
+
+        unformated_timestamp = (
+            data["startTime"] if state == "preparation" else data["endTime"]
+        )
+        timestamp = str(
+            datetime.strptime(unformated_timestamp, "%Y%m%dT%H%M%S.%fZ").timestamp()
+        )
+
+        state_text = f"{state.title()}\nTime until {'battle day' if state == 'preparation' else 'end of war'}: <t:{timestamp[:-2]}:R>"
+
+        embed.add_field(
+            name="__**War Info**__",
+            value=f"**Team Size:** {data['teamSize']}\n**Attacks per Member:** {data['attacksPerMember']}\n\n**War State**\n{state_text}",
+        )
+
+        embed.add_field(
+            name="__**War Stats**__",
+            value=f"**Ally**\n{data['clan']['attacks']} Attacks\n{data['clan']['stars']} Stars\n{data['clan']['destructionPercentage']}% Destruction\n\n**Opponent**\n{data['opponent']['attacks']} Attacks\n{data['opponent']['stars']} Stars\n{data['opponent']['destructionPercentage']}% Destruction",
+            inline=False,
+        )
+
+        return embed
+
     async def generate_user_embed(
         self, data: Dict, embed_colour: discord.Colour
     ) -> discord.Embed:
@@ -805,6 +1896,23 @@ class ClashOfClans(commands.Cog):
 
         return embed
 
+    def mark_stale(self, embed: discord.Embed, *payloads) -> discord.Embed:
+        """Adds when the data was fetched to the embed, if any of it was stale."""
+
+        stale = [data.fetched_at for data in payloads if self.cache.is_stale(data)]
+
+        if not stale:
+            return embed
+
+        embed.timestamp = datetime.fromtimestamp(min(stale), timezone.utc)
+
+        footer = embed.footer.text
+        embed.set_footer(
+            text=f"{footer} • Cached data as of" if footer else "Cached data as of"
+        )
+
+        return embed
+
     def millify(self, number: int):
         number = float(number)
 
@@ -854,11 +1962,283 @@ class ClashOfClans(commands.Cog):
                 f"Request returned {response.status}.\nError info: {await response.json()}"
             )
 
-    async def request(self, endpoint: str) -> Dict:
-        async with self.session.get(
-            self.BASE_URL + endpoint,
-            headers=self.default_headers,
-        ) as response:
-            if not await self.check_response_for_errors(response):
-                return False
-            return await response.json()
+    async def fetch_many(
+        self, endpoints: Iterable[str], priority: Priority = Priority.INTERACTIVE
+    ) -> List:
+        """Requests every endpoint concurrently, keeping the original order."""
+
+        semaphore = asyncio.Semaphore(await self.config.concurrency())
+
+        async def fetch(endpoint: str):
+            async with semaphore:
+                return await self.request(endpoint, priority=priority)
+
+        return await asyncio.gather(*(fetch(endpoint) for endpoint in endpoints))
+
+    async def find_location(self, name: str):
+        """Returns the id of a location by its name, ``None`` if there isn't one."""
+
+        data = await self.request("locations?limit=1000")
+
+        if not data or data == 404:
+            return False
+
+        for location in data["items"]:
+            if location["name"].lower() == name.lower():
+                return location["id"]
+
+    async def search_clans(
+        self,
+        name: Optional[str] = None,
+        location_id: Optional[int] = None,
+        min_members: Optional[int] = None,
+        page_size: int = SEARCH_PAGE_SIZE,
+        max_results: Optional[int] = None,
+    ) -> AsyncIterator[Dict]:
+        """Yields clans matching a search, one page of the API at a time.
+
+        Following pages are only requested when the previous one has been used
+        up, and nothing more is requested once ``max_results`` is reached.
+        """
+
+        params = {
+            "name": name,
+            "locationId": location_id,
+            "minMembers": min_members,
+            "limit": page_size,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        found = 0
+
+        while True:
+            data = await self.request(f"clans?{urlencode(params)}")
+
+            if not data or data == 404:
+                return
+
+            for clan in data["items"]:
+                yield clan
+
+                found += 1
+                if max_results and found >= max_results:
+                    return
+
+            after = data.get("paging", {}).get("cursors", {}).get("after")
+
+            if not after:
+                return
+
+            params["after"] = after
+
+    async def request(
+        self,
+        endpoint: str,
+        refresh: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict:
+        """Requests an endpoint, using the cache unless ``refresh`` is set.
+
+        Background work should pass ``Priority.BACKGROUND`` so it never holds up
+        commands, it may get ``False`` back when there is no room for it.
+        """
+
+        if not refresh:
+            if priority == Priority.INTERACTIVE:
+                self.prewarmer.record(endpoint)
+
+            cached = self.cache.get(endpoint)
+            if cached is not None:
+                return cached
+
+            if self.serve_stale:
+                stale = self.cache.get_stale(endpoint)
+
+                if stale is not None:
+                    # Revalidated in the background, the caller gets the old data now
+                    self.start_fetch(endpoint, Priority.BACKGROUND)
+                    return stale
+
+        # Shielded so one waiter being cancelled doesn't cancel the rest
+        data = await asyncio.shield(self.start_fetch(endpoint, priority))
+
+        if not data and (self.serve_stale or self.breaker.is_open):
+            return self.cache.get_stale(endpoint) or data
+
+        return data
+
+    def start_fetch(self, endpoint: str, priority: Priority) -> asyncio.Task:
+        """Starts fetching an endpoint, or returns the fetch already running."""
+
+        if endpoint in self.inflight:
+            task, ticket = self.inflight[endpoint]
+            self.scheduler.promote(ticket, priority)
+        else:
+            ticket = Ticket(priority)
+            task = asyncio.ensure_future(self._fetch(endpoint, ticket))
+            self.inflight[endpoint] = (task, ticket)
+
+            def done(_):
+                if self.inflight.get(endpoint, (None,))[0] is task:
+                    del self.inflight[endpoint]
+
+                # Background refreshes have nobody awaiting them to see errors
+                if not task.cancelled() and task.exception():
+                    logger.error(
+                        f"Request to {endpoint} failed.", exc_info=task.exception()
+                    )
+
+            task.add_done_callback(done)
+
+        return task
+
+    async def _fetch(self, endpoint: str, ticket: Ticket) -> Dict:
+        if not len(self.keys):
+            logger.warning("No API token has been set.")
+            return False
+
+        try:
+            async with self.scheduler.slot(ticket):
+                if not self.breaker.allow():
+                    logger.debug(
+                        f"The API circuit is {self.breaker.state}, skipping {endpoint}."
+                    )
+                    return False
+
+                healthy = False
+
+                try:
+                    data, healthy = await self._fetch_with_retries(endpoint)
+                finally:
+                    self.breaker.record(healthy)
+        except RequestShed:
+            logger.debug(f"Shed background request to {endpoint}.")
+            return False
+
+        return data
+
+    async def _fetch_with_retries(self, endpoint: str) -> Tuple[Dict, bool]:
+        """Returns the data, and whether the API looked healthy while getting it."""
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            key = await self.keys.acquire()
+
+            if key is None:
+                # Every token was removed while this request was waiting
+                return False, True
+
+            session = await self.get_session()
+            started = time.perf_counter()
+
+            # Lets the API answer 304 instead of sending everything again
+            previous = self.cache.peek(endpoint)
+            headers = {**key.headers, **(previous.validators() if previous else {})}
+
+            try:
+                async with session.get(
+                    self.BASE_URL + endpoint,
+                    headers=headers,
+                ) as response:
+                    body = await response.read()
+                    self.api_metrics.observe(
+                        endpoint,
+                        str(response.status),
+                        time.perf_counter() - started,
+                        len(body),
+                    )
+
+                    if response.status == 403 and len(self.keys) > 1:
+                        # Most likely a revoked key or one for another IP
+                        logger.warning(
+                            f"Token {key.masked} was rejected, suspending it for a while."
+                        )
+                        self.keys.suspend(key)
+
+                    retry = (
+                        response.status in self.RETRY_STATUSES
+                        or response.status == 403
+                        and len(self.keys) > 1
+                    ) and attempt < self.MAX_RETRIES
+
+                    if not retry:
+                        healthy = (
+                            response.status < 500
+                            and response.status not in self.RETRY_STATUSES
+                        )
+
+                        if response.status == 304 and previous is not None:
+                            return self._revalidate(previous, response), healthy
+
+                        status = await self.check_response_for_errors(response)
+                        if not status:
+                            return False, healthy
+                        elif status == 404:
+                            return 404, healthy
+
+                        return self._cache_response(endpoint, response, body), healthy
+
+                    delay = (
+                        0
+                        if response.status == 403
+                        else backoff_delay(attempt, response.headers.get("Retry-After"))
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self.api_metrics.observe(
+                    endpoint, type(error).__name__, time.perf_counter() - started
+                )
+                logger.warning(f"Request to {endpoint} failed: {error!r}")
+                return False, False
+            finally:
+                self.keys.release(key)
+
+            logger.debug(
+                f"Request to {endpoint} returned {response.status}, retrying in {delay:.2f}s."
+            )
+            await asyncio.sleep(delay)
+
+    def response_ttl(self, endpoint: str, data: Dict, response) -> Optional[float]:
+        if endpoint_family(endpoint) == "clanwarleagues" and war_ttl(data):
+            return war_ttl(data)
+
+        return max_age(response.headers.get("Cache-Control"))
+
+    def _revalidate(self, previous: Payload, response) -> Payload:
+        fetched_at = time.time()
+
+        previous.etag = response.headers.get("ETag") or previous.etag
+
+        ttl = self.response_ttl(previous.endpoint, previous, response)
+        data = self.cache.revalidated(previous, fetched_at, ttl)
+
+        self.store.queue(data)
+
+        return data
+
+    def _cache_response(self, endpoint: str, response, body: bytes) -> Dict:
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        previous = self.cache.peek(endpoint)
+
+        if previous is not None and previous.digest == digest:
+            # Same bytes as last time, so the decoded copy can be reused
+            return self._revalidate(previous, response)
+
+        data = json.loads(body)
+
+        if not self.cache.ttl(endpoint):
+            return data
+
+        fetched_at = time.time()
+
+        data = self.cache.set(
+            endpoint, data, fetched_at, self.response_ttl(endpoint, data, response)
+        )
+
+        data.etag = response.headers.get("ETag")
+        data.last_modified = response.headers.get("Last-Modified")
+        data.digest = digest
+
+        self.store.queue(data)
+
+        self.history.observe(endpoint, data, fetched_at)
+
+        return data
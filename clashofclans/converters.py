@@ -1,22 +1,31 @@
 from redbot.core import commands
 
+# Every character a player or clan tag can have
+TAG_CHARACTERS = set("0289PYLQGRJCUV")
+
 
 class TagConverter(commands.Converter):
     async def convert(self, ctx: commands.Context, arg: str):
-        return arg.replace("#", "")
+        tag = arg.replace("#", "").upper()
+
+        # So an optional tag doesn't swallow the arguments that come after it
+        if not tag or not set(tag) <= TAG_CHARACTERS:
+            raise commands.BadArgument(f"`{arg}` is not a valid tag.")
+
+        return tag
 
 
 class UnlinkTagConverter(commands.Converter):
     async def convert(self, ctx: commands.Context, arg: str):
         arg = arg.replace("#", "")
 
-        command = str(ctx.command)
+        command = ctx.command.name
 
-        tags = (
-            await ctx.cog.config.user(ctx.author).clan()
-            if command == "unlinkclan"
-            else await ctx.cog.config.user(ctx.author).accounts()
-        )
+        if command == "unlinkclan":
+            clan = await ctx.cog.linked_clan(ctx.author)
+            tags = [clan] if clan else []
+        else:
+            tags = await ctx.cog.linked_accounts(ctx.author)
 
         if arg not in tags:
             raise commands.BadArgument(
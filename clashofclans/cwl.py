@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Optional
+
+# Clan War League winners get this many bonus stars
+WIN_BONUS = 10
+
+
+def group_endpoint(clan_tag: str) -> str:
+    return f"clans/%23{clan_tag}/currentwar/leaguegroup"
+
+
+def war_endpoint(war_tag: str) -> str:
+    return f"clanwarleagues/wars/%23{war_tag.lstrip('#')}"
+
+
+def war_tags(group: Dict) -> List[str]:
+    """Every war tag that has been announced, ``#0`` means not announced yet."""
+
+    return [
+        tag
+        for league_round in group["rounds"]
+        for tag in league_round["warTags"]
+        if tag != "#0"
+    ]
+
+
+def war_ttl(data: Dict) -> Optional[float]:
+    """Finished wars never change, so they can be cached forever."""
+
+    if data.get("state") == "warEnded":
+        return float("inf")
+
+    return None
+
+
+def current_round(group: Dict) -> int:
+    return sum(
+        any(tag != "#0" for tag in league_round["warTags"])
+        for league_round in group["rounds"]
+    )
+
+
+def compute_standings(group: Dict, wars: Iterable[Dict]) -> List[Dict]:
+    """Ranks the clans of a league group by stars, then total destruction."""
+
+    standings = {
+        clan["tag"]: {
+            "tag": clan["tag"],
+            "name": clan["name"],
+            "stars": 0,
+            "destruction": 0.0,
+            "wins": 0,
+            "losses": 0,
+            "ties": 0,
+        }
+        for clan in group["clans"]
+    }
+
+    for war in wars:
+        if war.get("state") not in ("inWar", "warEnded"):
+            continue
+
+        sides = (war["clan"], war["opponent"])
+
+        for side, other in (sides, sides[::-1]):
+            clan = standings.get(side["tag"])
+            if clan is None:
+                continue
+
+            clan["stars"] += side["stars"]
+            clan["destruction"] += side["destructionPercentage"] * war["teamSize"]
+
+            if war["state"] != "warEnded":
+                continue
+
+            ours = (side["stars"], side["destructionPercentage"])
+            theirs = (other["stars"], other["destructionPercentage"])
+
+            if ours > theirs:
+                clan["wins"] += 1
+                clan["stars"] += WIN_BONUS
+            elif ours < theirs:
+                clan["losses"] += 1
+            else:
+                clan["ties"] += 1
+
+    return sorted(
+        standings.values(),
+        key=lambda clan: (clan["stars"], clan["destruction"]),
+        reverse=True,
+    )
@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .prewarm import clan_tag
+from .scheduler import Priority
+
+logger = logging.getLogger("red.finger_cogs.clashofclans.history")
+
+# Member fields that are tracked, and what they are called in commands
+METRICS = {
+    "donations": "donations",
+    "received": "donationsReceived",
+    "trophies": "trophies",
+}
+
+# Donation counters go back to zero when a season ends
+COUNTERS = ("donations", "received")
+
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+class MemberSeries:
+    """The history of one member, one fixed-width array per metric.
+
+    A point is four bytes per metric, so a season of hourly points for a full
+    clan stays well under a megabyte.
+    """
+
+    __slots__ = ("name", "clan", "times", "columns")
+
+    def __init__(self, name: str, clan: str):
+        self.name = name
+        self.clan = clan
+
+        self.times = array("I")
+        self.columns: Dict[str, array] = {metric: array("I") for metric in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, timestamp: float, member: Dict):
+        self.times.append(int(timestamp))
+
+        for metric, field in METRICS.items():
+            self.columns[metric].append(max(0, member.get(field, 0)))
+
+    def since(self, timestamp: float) -> int:
+        return bisect_left(self.times, int(timestamp))
+
+    def increase(self, metric: str, start: int) -> int:
+        """How much a counter went up from ``start``, counting across resets."""
+
+        values = self.columns[metric]
+        total = 0
+
+        for previous, value in zip(values[start:], values[start + 1 :]):
+            total += value - previous if value >= previous else value
+
+        return total
+
+    def keep(self, indexes: List[int]):
+        self.times = array("I", (self.times[i] for i in indexes))
+
+        for metric, values in self.columns.items():
+            self.columns[metric] = array("I", (values[i] for i in indexes))
+
+    def downsample(self, now: float, tiers: Iterable[Tuple[int, int]], max_age: int):
+        """Thins out old points, keeping one per bucket in each age tier.
+
+        The last point of a bucket is kept, and so is any point right before
+        a counter reset so no donations are lost across a season change.
+        """
+
+        cutoff = now - max_age
+        keep = []
+
+        for index, timestamp in enumerate(self.times):
+            if timestamp < cutoff:
+                continue
+
+            age = now - timestamp
+            bucket = next((size for older, size in tiers if age > older), None)
+
+            last = index + 1 == len(self.times)
+
+            if (
+                bucket is None
+                or last
+                or timestamp // bucket != self.times[index + 1] // bucket
+                or any(
+                    self.columns[metric][index + 1] < self.columns[metric][index]
+                    for metric in COUNTERS
+                )
+            ):
+                keep.append(index)
+
+        if len(keep) != len(self.times):
+            self.keep(keep)
+
+
+class History:
+    """Donation and trophy history of the members of linked clans.
+
+    Clans are snapshotted in the background, and every fresh ``clans/``
+    response for a linked clan adds a point too. Old points are downsampled
+    and the series are saved to SQLite so history survives restarts.
+    """
+
+    TICK = 300
+    # How often linked clans are snapshotted
+    SNAPSHOT_INTERVAL = 3600
+    # Points closer together than this are skipped
+    MIN_INTERVAL = 300
+    # (age, bucket), points older than age are thinned to one per bucket seconds
+    TIERS = ((7 * 86400, 86400), (86400, 3600))
+    # About a season and a half
+    MAX_AGE = 45 * 86400
+
+    def __init__(self, cog, path: Path):
+        self.cog = cog
+        self.path = path
+
+        self.members: Dict[str, MemberSeries] = {}
+        self.clans: Dict[str, Set[str]] = {}
+
+        self.last_snapshot: Dict[str, float] = {}
+        self.dirty: Set[str] = set()
+
+    def observe(self, endpoint: str, data: Dict, timestamp: float):
+        tag = clan_tag(endpoint)
+
+        if endpoint != f"clans/%23{tag}" or not self.cog.links.members(tag):
+            return
+
+        self.record(tag, data, timestamp)
+
+    def record(self, tag: str, data: Dict, timestamp: float):
+        self.clans[tag] = set()
+
+        for member in data.get("memberList", []):
+            member_tag = member["tag"][1:]
+            self.clans[tag].add(member_tag)
+
+            series = self.members.get(member_tag)
+
+            if series is None:
+                series = self.members[member_tag] = MemberSeries(member["name"], tag)
+
+            series.name = member["name"]
+            series.clan = tag
+
+            if series.times and timestamp - series.times[-1] < self.MIN_INTERVAL:
+                continue
+
+            series.append(timestamp, member)
+            self.dirty.add(member_tag)
+
+    def top_donors(self, tag: str, since: float) -> List[Tuple[str, int, int]]:
+        """Returns the name, donations and troops received of each member."""
+
+        results = []
+
+        for member_tag in self.clans.get(tag, ()):
+            series = self.members.get(member_tag)
+
+            if series is None:
+                continue
+
+            # Only changes seen inside the window count, however sparse it is
+            start = series.since(since)
+
+            results.append(
+                (
+                    series.name,
+                    series.increase("donations", start),
+                    series.increase("received", start),
+                )
+            )
+
+        return results
+
+    def trend(
+        self, member_tag: str, metric: str, since: float
+    ) -> Optional[Tuple[MemberSeries, array, array]]:
+        series = self.members.get(member_tag)
+
+        if series is None:
+            return None
+
+        start = series.since(since)
+
+        return series, series.times[start:], series.columns[metric][start:]
+
+    def downsample(self):
+        now = time.time()
+
+        for member_tag, series in list(self.members.items()):
+            before = len(series)
+            series.downsample(now, self.TIERS, self.MAX_AGE)
+
+            if not series:
+                del self.members[member_tag]
+            if len(series) != before:
+                self.dirty.add(member_tag)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path))
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS history (member TEXT PRIMARY KEY, "
+            "name TEXT NOT NULL, clan TEXT NOT NULL, times BLOB NOT NULL, "
+            + ", ".join(f"{metric} BLOB NOT NULL" for metric in METRICS)
+            + ")"
+        )
+
+        return connection
+
+    def _write(self, rows: List[Tuple], removed: List[Tuple[str]]):
+        connection = self._connect()
+
+        try:
+            with connection:
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO history VALUES "
+                    f"(?, ?, ?, ?, {', '.join('?' for _ in METRICS)})",
+                    rows,
+                )
+                connection.executemany("DELETE FROM history WHERE member = ?", removed)
+        finally:
+            connection.close()
+
+    def _read(self) -> List[Tuple]:
+        connection = self._connect()
+
+        try:
+            return connection.execute(
+                f"SELECT member, name, clan, times, {', '.join(METRICS)} FROM history"
+            ).fetchall()
+        finally:
+            connection.close()
+
+    async def flush(self):
+        if not self.dirty:
+            return
+
+        rows = []
+        removed = []
+
+        for member_tag in self.dirty:
+            series = self.members.get(member_tag)
+
+            if series is None:
+                removed.append((member_tag,))
+                continue
+
+            rows.append(
+                (
+                    member_tag,
+                    series.name,
+                    series.clan,
+                    series.times.tobytes(),
+                    *(series.columns[metric].tobytes() for metric in METRICS),
+                )
+            )
+
+        self.dirty = set()
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write, rows, removed
+        )
+
+    async def load(self):
+        rows = await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+        for member_tag, name, clan, times, *columns in rows:
+            if member_tag in self.members:
+                # Already recorded since starting up
+                continue
+
+            series = MemberSeries(name, clan)
+            series.times.frombytes(times)
+
+            for metric, values in zip(METRICS, columns):
+                series.columns[metric].frombytes(values)
+
+            self.members[member_tag] = series
+            self.clans.setdefault(clan, set()).add(member_tag)
+
+    async def tick(self):
+        now = time.time()
+
+        due = [
+            tag
+            for tag in self.cog.links.clan_users
+            if now - self.last_snapshot.get(tag, 0) > self.SNAPSHOT_INTERVAL
+        ]
+
+        results = await self.cog.fetch_many(
+            (f"clans/%23{tag}" for tag in due), Priority.BACKGROUND
+        )
+
+        for tag, data in zip(due, results):
+            if not data:
+                # Dropped or failed, tried again next tick
+                continue
+
+            self.last_snapshot[tag] = now
+
+            if data == 404:
+                continue
+
+            # Cache hits and revalidated responses never reach observe
+            self.record(tag, data, getattr(data, "fetched_at", now))
+
+        self.downsample()
+        await self.flush()
+
+    async def run(self):
+        try:
+            await self.load()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # New points are still worth recording without the old ones
+            logger.exception("Error while loading clan history.")
+
+        await self.cog.links.ready.wait()
+
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error while recording clan history.")
+
+            await asyncio.sleep(self.TICK)
+
+
+def sparkline(values: Iterable[int]) -> str:
+    values = list(values)
+
+    if not values:
+        return ""
+
+    low = min(values)
+    spread = (max(values) - low) or 1
+
+    return "".join(
+        SPARKS[(value - low) * (len(SPARKS) - 1) // spread] for value in values
+    )
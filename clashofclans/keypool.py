@@ -0,0 +1,100 @@
+import itertools
+import time
+from typing import Iterable, List, Optional
+
+from .ratelimit import TokenBucket
+
+STRATEGIES = ("roundrobin", "leastloaded")
+
+
+class ApiKey:
+    def __init__(self, token: str, rate: float):
+        self.token = token
+        self.bucket = TokenBucket(rate)
+
+        self.inflight = 0
+        self.suspended_until = 0.0
+
+    @property
+    def headers(self):
+        return {"Authorization": "Bearer " + self.token}
+
+    @property
+    def suspended(self) -> bool:
+        return self.suspended_until > time.monotonic()
+
+    @property
+    def masked(self) -> str:
+        return f"{self.token[:4]}...{self.token[-4:]}"
+
+
+class KeyPool:
+    """Spreads requests over several API tokens, each with its own rate limit.
+
+    Tokens that get rejected can be suspended so they are skipped for a while.
+    """
+
+    def __init__(self, rate: float, strategy: str = "roundrobin"):
+        self.rate = rate
+        self.strategy = strategy
+
+        self.keys: List[ApiKey] = []
+        self._cycle = itertools.cycle(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def set_tokens(self, tokens: Iterable[str]):
+        existing = {key.token: key for key in self.keys}
+
+        self.keys = [
+            existing.get(token) or ApiKey(token, self.rate)
+            for token in dict.fromkeys(tokens)
+            if token
+        ]
+        self._cycle = itertools.cycle(self.keys)
+
+    def set_rate(self, rate: float):
+        self.rate = rate
+
+        for key in self.keys:
+            key.bucket.set_rate(rate)
+
+    def available(self) -> float:
+        """The number of requests that can be made right now without waiting."""
+
+        return sum(key.bucket.available() for key in self.keys if not key.suspended)
+
+    def choose(self) -> Optional[ApiKey]:
+        active = [key for key in self.keys if not key.suspended]
+
+        if not active:
+            # Better to try a suspended key than to not make the request at all
+            active = self.keys
+
+        if not active:
+            return None
+
+        if self.strategy == "leastloaded":
+            return min(active, key=lambda key: (key.inflight, -key.bucket.tokens))
+
+        for key in self._cycle:
+            if key in active:
+                return key
+
+    async def acquire(self) -> Optional[ApiKey]:
+        key = self.choose()
+
+        if key is None:
+            return None
+
+        key.inflight += 1
+        await key.bucket.acquire()
+
+        return key
+
+    def release(self, key: ApiKey):
+        key.inflight -= 1
+
+    def suspend(self, key: ApiKey, seconds: float = 300):
+        key.suspended_until = time.monotonic() + seconds
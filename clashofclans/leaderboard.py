@@ -0,0 +1,83 @@
+import heapq
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SORT_KEYS: Dict[str, Callable[[Dict], float]] = {
+    "donations": lambda member: member["donations"],
+    "received": lambda member: member["donationsReceived"],
+    "ratio": lambda member: member["donations"] / max(1, member["donationsReceived"]),
+    "trophies": lambda member: member["trophies"],
+    "versustrophies": lambda member: member.get("versusTrophies", 0),
+}
+
+# Members paired with the name of their clan, for leaderboards across clans
+Row = Tuple[Dict, Optional[str]]
+
+
+def format_value(sort_key: str, value: float) -> str:
+    return f"{value:.2f}" if sort_key == "ratio" else str(int(value))
+
+
+class Leaderboard:
+    """Clan members ranked by one sort key, only ranked as far as is read.
+
+    Members are heapified once, then each page pops just enough of them, so
+    showing the first page of a big leaderboard never sorts the rest. Ties
+    keep the order members were given in instead of replacing each other.
+    """
+
+    def __init__(self, rows: Iterable[Row], sort_key: str, per_page: int = 10):
+        self.sort_key = sort_key
+        self.per_page = per_page
+
+        key = SORT_KEYS[sort_key]
+
+        self._heap = [
+            (-key(member), index, member, clan)
+            for index, (member, clan) in enumerate(rows)
+        ]
+        heapq.heapify(self._heap)
+
+        self.total = len(self._heap)
+        self.ranked: List[Tuple[float, Dict, Optional[str]]] = []
+
+    @classmethod
+    def from_clans(
+        cls, clans: Iterable[Dict], sort_key: str, per_page: int = 10
+    ) -> "Leaderboard":
+        clans = list(clans)
+        # Only worth showing which clan someone is in if there are several
+        several = len(clans) > 1
+
+        return cls(
+            (
+                (member, clan["name"] if several else None)
+                for clan in clans
+                for member in clan["memberList"]
+            ),
+            sort_key,
+            per_page,
+        )
+
+    @property
+    def pages(self) -> int:
+        return max(1, math.ceil(self.total / self.per_page))
+
+    def top(self, count: int) -> List[Tuple[float, Dict, Optional[str]]]:
+        while len(self.ranked) < count and self._heap:
+            value, _, member, clan = heapq.heappop(self._heap)
+            self.ranked.append((-value, member, clan))
+
+        return self.ranked[:count]
+
+    def page(self, index: int) -> List[Tuple[int, str, Dict, Optional[str]]]:
+        """Returns the position, formatted value, member and clan of each row."""
+
+        start = index * self.per_page
+
+        return [
+            (position, format_value(self.sort_key, value), member, clan)
+            for position, (value, member, clan) in enumerate(
+                self.top(start + self.per_page)[start:], start=start + 1
+            )
+        ]
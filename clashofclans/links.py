@@ -0,0 +1,85 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Set
+
+
+class LinkIndex:
+    """Who has linked what, kept in memory in both directions.
+
+    Built from config once at startup and updated by the link commands, so
+    finding the owners of a tag or the users in a clan never scans config.
+    """
+
+    def __init__(self):
+        self.accounts: Dict[int, List[str]] = {}
+        self.clans: Dict[int, str] = {}
+
+        self.tag_owners: Dict[str, Set[int]] = defaultdict(set)
+        self.clan_users: Dict[str, Set[int]] = defaultdict(set)
+
+        self.ready = asyncio.Event()
+
+    def load(self, users: Dict[int, Dict]):
+        for user_id, data in users.items():
+            for tag in data.get("accounts", []):
+                self.link(user_id, tag)
+
+            if data.get("clan"):
+                self.link_clan(user_id, data["clan"])
+
+        self.ready.set()
+
+    def link(self, user_id: int, tag: str):
+        self.accounts.setdefault(user_id, []).append(tag)
+        self.tag_owners[tag].add(user_id)
+
+    def unlink(self, user_id: int, tag: str):
+        tags = self.accounts.get(user_id, [])
+
+        if tag in tags:
+            tags.remove(tag)
+
+        if tag not in tags:
+            self._discard(self.tag_owners, tag, user_id)
+
+        if not tags:
+            self.accounts.pop(user_id, None)
+
+    def link_clan(self, user_id: int, tag: str):
+        self.unlink_clan(user_id)
+
+        self.clans[user_id] = tag
+        self.clan_users[tag].add(user_id)
+
+    def unlink_clan(self, user_id: int):
+        tag = self.clans.pop(user_id, None)
+
+        if tag is not None:
+            self._discard(self.clan_users, tag, user_id)
+
+    def forget(self, user_id: int):
+        for tag in list(self.accounts.get(user_id, [])):
+            self.unlink(user_id, tag)
+
+        self.unlink_clan(user_id)
+
+    def owners(self, tag: str) -> Set[int]:
+        return self.tag_owners.get(tag, set())
+
+    def members(self, tag: str) -> Set[int]:
+        return self.clan_users.get(tag, set())
+
+    def has_links(self, user_id: int) -> bool:
+        return user_id in self.accounts or user_id in self.clans
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], tag: str, user_id: int):
+        users = index.get(tag)
+
+        if users is None:
+            return
+
+        users.discard(user_id)
+
+        if not users:
+            del index[tag]
@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+import functools
+from typing import AsyncIterator, Callable, Dict, List
+
+import discord
+from redbot.core.utils.menus import menu
+
+
+def placeholder() -> discord.Embed:
+    return discord.Embed(description="Loading...")
+
+
+class LazyPages:
+    """Menu pages that are only rendered when someone navigates to them.
+
+    Red's ``menu`` needs a real list, so pages that haven't been rendered are
+    placeholder embeds in ``pages`` until ``ensure`` swaps them out. The page
+    after the one being shown is rendered in the background so going forward
+    feels instant.
+    """
+
+    def __init__(self, count: int, render: Callable):
+        self.render = render
+        self.pages: List[discord.Embed] = []
+        self.count = count
+
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    @property
+    def count(self) -> int:
+        return len(self.pages)
+
+    @count.setter
+    def count(self, count: int):
+        del self.pages[count:]
+        self.pages += [placeholder() for _ in range(count - len(self.pages))]
+
+    def _task(self, index: int) -> asyncio.Task:
+        task = self._tasks.get(index)
+
+        if task is None or task.cancelled():
+            task = self._tasks[index] = asyncio.ensure_future(self.render(index))
+
+        return task
+
+    async def ensure(self, index: int) -> discord.Embed:
+        index %= self.count
+        page = await self._task(index)
+
+        # Streamed pages can turn out to have fewer pages while rendering
+        if index < self.count:
+            self.pages[index] = page
+
+        if index + 1 < self.count:
+            self._task(index + 1)
+
+        return page
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+
+class StreamPages(LazyPages):
+    """Pages built from an async iterator, only pulled as far as someone reads.
+
+    The number of pages isn't known up front, so there is always one more
+    page than has been rendered until the iterator runs out.
+    """
+
+    def __init__(
+        self,
+        items: AsyncIterator,
+        per_page: int,
+        render_items: Callable[[int, List, bool], discord.Embed],
+    ):
+        super().__init__(1, self._render)
+
+        self.items = items
+        self.per_page = per_page
+        self.render_items = render_items
+        self.exhausted = False
+
+    async def _render(self, index: int) -> discord.Embed:
+        if index:
+            # Items have to be pulled in order
+            await self._task(index - 1)
+
+        chunk = []
+
+        while not self.exhausted and len(chunk) < self.per_page:
+            try:
+                chunk.append(await self.items.__anext__())
+            except StopAsyncIteration:
+                self.exhausted = True
+
+        if not chunk and index:
+            # The last page turned out to be empty
+            self.count = index
+            return await self._task(index - 1)
+
+        if not self.exhausted:
+            self.count = max(self.count, index + 2)
+
+        return self.render_items(index, chunk, self.exhausted)
+
+
+async def _change_page(
+    ctx, pages, controls, message, page, timeout, emoji, *, lazy, step, user=None
+):
+    # Red passes no controls when the menu uses buttons instead of reactions
+    if controls is not None:
+        perms = message.channel.permissions_for(ctx.me)
+        if perms.manage_messages:
+            with contextlib.suppress(discord.NotFound):
+                await message.remove_reaction(emoji, user or ctx.author)
+
+    page = (page + step) % len(lazy)
+    await lazy.ensure(page)
+    # Streamed pages can find out there are fewer pages than expected
+    page %= len(lazy)
+
+    # A copy, so Red notices the menu's pages changed
+    kwargs = {"user": user} if user is not None else {}
+    return await menu(ctx, list(lazy.pages), controls, message, page, timeout, **kwargs)
+
+
+def lazy_controls(pages: LazyPages) -> Dict[str, functools.partial]:
+    return {
+        "⬅️": functools.partial(_change_page, lazy=pages, step=-1),
+        "➡️": functools.partial(_change_page, lazy=pages, step=1),
+    }
+
+
+async def lazy_menu(ctx, pages: LazyPages, timeout: float = 30.0):
+    await pages.ensure(0)
+
+    try:
+        return await menu(ctx, list(pages.pages), lazy_controls(pages), timeout=timeout)
+    finally:
+        pages.cancel()
@@ -0,0 +1,133 @@
+import bisect
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .cache import ResponseCache, endpoint_family
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKET_LABELS = (*map(str, LATENCY_BUCKETS), "+Inf")
+
+
+class FamilyMetrics:
+    __slots__ = ("requests", "statuses", "buckets", "latency_sum", "bytes")
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        # One more bucket than bounds, for everything slower than the last one
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.bytes = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a latency quantile as the upper bound of its bucket.
+
+        Returns ``None`` when it is slower than the last bucket.
+        """
+
+        if not self.requests:
+            return 0.0
+
+        target = q * self.requests
+        seen = 0
+
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+
+        return None
+
+
+def format_latency(latency: Optional[float]) -> str:
+    if latency is None:
+        return f">{LATENCY_BUCKETS[-1]}s"
+
+    return f"{latency}s"
+
+
+class Metrics:
+    """Counts API requests, their latency, status codes and sizes per family."""
+
+    def __init__(self):
+        self.families: Dict[str, FamilyMetrics] = {}
+
+    def observe(self, endpoint: str, status: str, latency: float, size: int = 0):
+        family = endpoint_family(endpoint)
+        metrics = self.families.get(family)
+
+        if metrics is None:
+            metrics = self.families[family] = FamilyMetrics()
+
+        metrics.requests += 1
+        metrics.statuses[status] += 1
+        metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        metrics.latency_sum += latency
+        metrics.bytes += size
+
+    def to_dict(self, cache: ResponseCache) -> Dict:
+        families = (
+            set(self.families) | set(cache.family_hits) | set(cache.family_misses)
+        )
+
+        result = {"cache": cache.stats(), "families": {}}
+
+        for family in sorted(families):
+            metrics = self.families.get(family) or FamilyMetrics()
+            hits = cache.family_hits[family]
+            lookups = hits + cache.family_misses[family]
+
+            result["families"][family] = {
+                "requests": metrics.requests,
+                "statuses": dict(metrics.statuses),
+                "latency": {
+                    "buckets": dict(zip(BUCKET_LABELS, metrics.buckets)),
+                    "sum": metrics.latency_sum,
+                    "p50": metrics.quantile(0.5),
+                    "p99": metrics.quantile(0.99),
+                },
+                "bytes": metrics.bytes,
+                "cache_hits": hits,
+                "cache_misses": cache.family_misses[family],
+                "cache_hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+        return result
+
+    def to_prometheus(self, cache: ResponseCache) -> str:
+        lines = [
+            "# TYPE clash_api_requests_total counter",
+            "# TYPE clash_api_request_duration_seconds histogram",
+            "# TYPE clash_api_response_bytes_total counter",
+            "# TYPE clash_cache_hits_total counter",
+            "# TYPE clash_cache_misses_total counter",
+        ]
+
+        for family, metrics in sorted(self.families.items()):
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'clash_api_requests_total{{family="{family}",status="{status}"}} {count}'
+                )
+
+            cumulative = 0
+
+            for bound, count in zip(BUCKET_LABELS, metrics.buckets):
+                cumulative += count
+                lines.append(
+                    f'clash_api_request_duration_seconds_bucket{{family="{family}",le="{bound}"}} {cumulative}'
+                )
+
+            lines += [
+                f'clash_api_request_duration_seconds_sum{{family="{family}"}} {metrics.latency_sum}',
+                f'clash_api_request_duration_seconds_count{{family="{family}"}} {metrics.requests}',
+                f'clash_api_response_bytes_total{{family="{family}"}} {metrics.bytes}',
+            ]
+
+        for family, count in sorted(cache.family_hits.items()):
+            lines.append(f'clash_cache_hits_total{{family="{family}"}} {count}')
+
+        for family, count in sorted(cache.family_misses.items()):
+            lines.append(f'clash_cache_misses_total{{family="{family}"}} {count}')
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from .scheduler import Priority
+
+logger = logging.getLogger("red.finger_cogs.clashofclans.prewarm")
+
+
+def clan_tag(endpoint: str) -> Optional[str]:
+    """Returns the clan tag of a ``clans/%23<tag>...`` endpoint."""
+
+    if not endpoint.startswith("clans/%23"):
+        return None
+
+    return endpoint[len("clans/%23") :].split("/", 1)[0].split("?", 1)[0]
+
+
+class Prewarmer:
+    """Refreshes linked clans and their current wars before they are asked for.
+
+    Clans that are linked by more users, or looked up more often, are
+    refreshed more often. Every refresh is paid for out of a budget of
+    requests per minute so polling can never eat the whole API quota.
+    """
+
+    TICK = 10
+    # How often the linked clans are read from the link index
+    LINKS_REFRESH = 300
+    # Lookups are halved this often so popularity follows recent use
+    DECAY = 600
+    # A clan with this weight or less is refreshed at the slowest rate
+    SLOWEST_MULTIPLIER = 10
+
+    def __init__(self, cog):
+        self.cog = cog
+
+        self.linked: Counter = Counter()
+        self.lookups: Counter = Counter()
+        self.next_due: Dict[str, float] = {}
+
+        self.allowance = 0.0
+        self.last_links_refresh = 0.0
+        self.last_decay = time.monotonic()
+
+    def record(self, endpoint: str):
+        tag = clan_tag(endpoint)
+
+        if tag:
+            self.lookups[tag] += 1
+
+    def interval(self, tag: str) -> float:
+        ttl = min(
+            self.cog.cache.ttl(f"clans/%23{tag}"),
+            self.cog.cache.ttl(f"clans/%23{tag}/currentwar"),
+        )
+        weight = self.linked[tag] + self.lookups[tag]
+
+        # Refresh a little before the cached data expires, but no sooner
+        fastest = ttl * 0.9
+        slowest = ttl * self.SLOWEST_MULTIPLIER
+
+        return max(fastest, slowest / max(weight, 1))
+
+    async def refresh_links(self):
+        await self.cog.links.ready.wait()
+
+        self.linked = Counter(
+            {tag: len(users) for tag, users in self.cog.links.clan_users.items()}
+        )
+
+        for tag in list(self.next_due):
+            if tag not in self.linked:
+                del self.next_due[tag]
+
+        for tag in self.linked:
+            self.next_due.setdefault(tag, 0)
+
+    async def tick(self):
+        now = time.monotonic()
+
+        if now - self.last_links_refresh > self.LINKS_REFRESH:
+            await self.refresh_links()
+            self.last_links_refresh = now
+
+        if now - self.last_decay > self.DECAY:
+            self.lookups = Counter(
+                {tag: count // 2 for tag, count in self.lookups.items() if count > 1}
+            )
+            self.last_decay = now
+
+        budget = await self.cog.config.prewarm_budget()
+
+        # Unused allowance carries over, but only up to one minute's worth
+        self.allowance = min(budget, self.allowance + budget * self.TICK / 60)
+
+        due = sorted(
+            (due_at, tag) for tag, due_at in self.next_due.items() if due_at <= now
+        )
+
+        endpoints = []
+
+        for _, tag in due:
+            if self.allowance < 2:
+                break
+
+            self.allowance -= 2
+            self.next_due[tag] = now + self.interval(tag)
+
+            endpoints += [f"clans/%23{tag}", f"clans/%23{tag}/currentwar"]
+
+        if endpoints:
+            await asyncio.gather(
+                *(
+                    self.cog.request(
+                        endpoint, refresh=True, priority=Priority.BACKGROUND
+                    )
+                    for endpoint in endpoints
+                )
+            )
+
+    async def run(self):
+        await self.cog.bot.wait_until_ready()
+
+        while True:
+            try:
+                if await self.cog.config.prewarm():
+                    await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error while prewarming clans.")
+
+            await asyncio.sleep(self.TICK)
@@ -0,0 +1,72 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second with bursts of up to ``capacity``.
+
+    Callers wait in line for a token instead of failing when the bucket is
+    empty.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1, capacity or rate)
+
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+        self._lock = asyncio.Lock()
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None):
+        self._refill()
+
+        self.rate = rate
+        self.capacity = max(1, capacity or rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+
+        return self.tokens
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+
+            self.tokens -= 1
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[str] = None,
+    base: float = 0.5,
+    maximum: float = 30.0,
+) -> float:
+    """How long to wait before retry number ``attempt``, starting at 0.
+
+    Uses full jitter exponential backoff, but never waits less than the
+    server's ``Retry-After`` header asks for.
+    """
+
+    delay = random.uniform(0, min(maximum, base * 2 ** attempt))
+
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+
+    return min(delay, maximum)
@@ -0,0 +1,63 @@
+import copy
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import discord
+
+EmbedKey = Tuple[str, str, str, int, int]
+
+
+class EmbedCache:
+    """A size bounded LRU cache of rendered embeds.
+
+    Embeds are keyed by what went into them: the kind of embed, the payload's
+    endpoint and digest, the embed colour and the emoji version. Changing the
+    emojis bumps the version, so embeds rendered with the old ones are never
+    served, even if they finish rendering after the change.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[EmbedKey, Dict]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, kind: str, data: Dict, colour: discord.Colour) -> Optional[EmbedKey]:
+        """Returns the key for an embed of ``data``, if it can be cached."""
+
+        digest = getattr(data, "digest", None)
+
+        if digest is None:
+            return None
+
+        return (kind, data.endpoint, digest, colour.value, self.version)
+
+    def get(self, key: EmbedKey) -> Optional[discord.Embed]:
+        rendered = self._entries.get(key)
+
+        if rendered is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        # Callers add footers and timestamps, so each gets its own copy
+        return discord.Embed.from_dict(copy.deepcopy(rendered))
+
+    def set(self, key: EmbedKey, embed: discord.Embed):
+        self._entries[key] = copy.deepcopy(embed.to_dict())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self.version += 1
+        self._entries.clear()
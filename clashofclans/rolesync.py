@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+import discord
+
+from .scheduler import Priority
+
+logger = logging.getLogger("red.finger_cogs.clashofclans.rolesync")
+
+# Clan roles as the API calls them, from lowest to highest. Elders are "admin"
+RANKS = ("member", "admin", "coLeader", "leader")
+
+RANK_NAMES = {
+    "member": "member",
+    "elder": "admin",
+    "coleader": "coLeader",
+    "leader": "leader",
+}
+
+
+def desired_roles(
+    settings: Dict,
+    players: Iterable[Dict],
+    linked_clan: Optional[str],
+    clans: Dict[str, Dict],
+) -> Set[int]:
+    """Works out which of the synced roles a user should have.
+
+    The highest town hall of their accounts picks the town hall role, every
+    configured clan an account is in adds that clan's role, and the highest
+    rank held in a tracked clan picks the rank role.
+    """
+
+    roles = set()
+    townhall = 0
+    rank = -1
+
+    tracked = set(settings["clan"])
+    if linked_clan:
+        tracked.add(linked_clan)
+
+    memberships = []
+
+    players = list(players)
+
+    for player in players:
+        townhall = max(townhall, player["townHallLevel"])
+
+        if player.get("clan"):
+            memberships.append((player["clan"]["tag"][1:], player.get("role")))
+
+    account_tags = {player["tag"] for player in players}
+
+    for tag, clan in clans.items():
+        for member in clan.get("memberList", []):
+            if member["tag"] in account_tags:
+                memberships.append((tag, member["role"]))
+
+    for tag, role in memberships:
+        if tag in settings["clan"]:
+            roles.add(settings["clan"][tag])
+
+        if tag in tracked and role in RANKS:
+            rank = max(rank, RANKS.index(role))
+
+    if str(townhall) in settings["townhall"]:
+        roles.add(settings["townhall"][str(townhall)])
+
+    if rank >= 0 and RANKS[rank] in settings["rank"]:
+        roles.add(settings["rank"][RANKS[rank]])
+
+    return roles
+
+
+def managed_roles(settings: Dict) -> Set[int]:
+    return {role_id for mapping in settings.values() for role_id in mapping.values()}
+
+
+class RoleSync:
+    """Keeps Discord roles in line with linked Clash accounts.
+
+    Only the difference between the roles a member has and should have is
+    sent to Discord. Users are handled in batches, their payloads come from
+    the cache where possible and the rest are fetched no faster than the API
+    tokens allow. Edits are spaced out so a big guild can't run into
+    Discord's rate limits.
+    """
+
+    # How often every guild is synced
+    INTERVAL = 3600
+    USERS_PER_BATCH = 50
+    EDITS_PER_BATCH = 10
+    BATCH_DELAY = 5
+    # How long to wait for the API tokens to refill when there's no room
+    FETCH_DELAY = 0.5
+    # Older cached payloads are fetched again, so roles lag at most one sync
+    MAX_AGE = INTERVAL
+
+    def __init__(self, cog):
+        self.cog = cog
+
+        self.running: Set[int] = set()
+
+    async def payloads(self, endpoints: Iterable[str]) -> Dict[str, Dict]:
+        """Payloads cached within ``MAX_AGE``, the rest fetched in the background."""
+
+        now = time.time()
+        found = {}
+        missing = []
+
+        for endpoint in set(endpoints):
+            data = self.cog.cache.peek(endpoint)
+
+            if data is None or now - data.fetched_at > self.MAX_AGE:
+                missing.append(endpoint)
+            else:
+                found[endpoint] = data
+
+        results = await self.fetch(missing)
+
+        for endpoint, data in zip(missing, results):
+            if data and data != 404:
+                found[endpoint] = data
+
+        return found
+
+    async def fetch(self, endpoints: List[str]) -> List:
+        """Fetches in chunks the API tokens can serve, waiting for them in between."""
+
+        if not len(self.cog.keys):
+            return await self.cog.fetch_many(endpoints, Priority.BACKGROUND)
+
+        results = []
+
+        while len(results) < len(endpoints):
+            room = int(self.cog.background_room())
+
+            if room < 1:
+                await asyncio.sleep(self.FETCH_DELAY)
+                continue
+
+            chunk = endpoints[len(results) : len(results) + room]
+            results += await self.cog.fetch_many(chunk, Priority.BACKGROUND)
+
+        return results
+
+    def candidates(self, guild: discord.Guild, roles: Set[int]) -> List[discord.Member]:
+        """Linked members, and members who have a synced role to take away."""
+
+        members = {
+            member.id: member
+            for role_id in roles
+            for member in getattr(guild.get_role(role_id), "members", [])
+        }
+
+        for user_id in {*self.cog.links.accounts, *self.cog.links.clans}:
+            member = guild.get_member(user_id)
+
+            if member is not None:
+                members[user_id] = member
+
+        return [member for member in members.values() if not member.bot]
+
+    async def sync_guild(self, guild: discord.Guild, settings: Dict) -> Counter:
+        stats = Counter()
+
+        if guild.id in self.running:
+            return stats
+
+        self.running.add(guild.id)
+
+        try:
+            await self._sync_guild(guild, settings, stats)
+        finally:
+            self.running.discard(guild.id)
+
+        return stats
+
+    async def _sync_guild(self, guild: discord.Guild, settings: Dict, stats: Counter):
+        await self.cog.links.ready.wait()
+
+        top_role = guild.me.top_role
+
+        # Roles that are gone or above the bot can't be given or taken away
+        roles = {
+            role_id: guild.get_role(role_id) for role_id in managed_roles(settings)
+        }
+        roles = {
+            role_id: role
+            for role_id, role in roles.items()
+            if role is not None and role < top_role
+        }
+
+        if not roles:
+            return
+
+        members = self.candidates(guild, set(roles))
+        edits = 0
+
+        for start in range(0, len(members), self.USERS_PER_BATCH):
+            batch = members[start : start + self.USERS_PER_BATCH]
+
+            links = {
+                member.id: (
+                    self.cog.links.accounts.get(member.id, []),
+                    self.cog.links.clans.get(member.id),
+                )
+                for member in batch
+            }
+
+            payloads = await self.payloads(
+                [
+                    *(
+                        f"players/%23{tag}"
+                        for accounts, _ in links.values()
+                        for tag in accounts
+                    ),
+                    *(f"clans/%23{clan}" for _, clan in links.values() if clan),
+                ]
+            )
+
+            for member in batch:
+                accounts, clan = links[member.id]
+
+                players = [payloads.get(f"players/%23{tag}") for tag in accounts]
+                clan_data = payloads.get(f"clans/%23{clan}") if clan else None
+
+                if None in players or (clan and clan_data is None):
+                    # Better to leave roles alone than to take them by mistake
+                    stats["skipped"] += 1
+                    continue
+
+                desired = desired_roles(
+                    settings, players, clan, {clan: clan_data} if clan else {}
+                )
+                current = {role.id for role in member.roles if role.id in roles}
+
+                add = [
+                    roles[role_id] for role_id in desired - current if role_id in roles
+                ]
+                remove = [roles[role_id] for role_id in current - desired]
+
+                stats["checked"] += 1
+
+                if not add and not remove:
+                    continue
+
+                try:
+                    if add:
+                        await member.add_roles(*add, reason="Clash of Clans role sync")
+                    if remove:
+                        await member.remove_roles(
+                            *remove, reason="Clash of Clans role sync"
+                        )
+                except discord.HTTPException:
+                    logger.warning("Could not sync the roles of %s.", member.id)
+                    stats["failed"] += 1
+                    continue
+
+                stats["added"] += len(add)
+                stats["removed"] += len(remove)
+
+                edits += len(add) + len(remove)
+
+                if edits >= self.EDITS_PER_BATCH:
+                    edits = 0
+                    await asyncio.sleep(self.BATCH_DELAY)
+
+    async def run(self):
+        await self.cog.bot.wait_until_ready()
+
+        while True:
+            try:
+                for guild_id, data in (await self.cog.config.all_guilds()).items():
+                    guild = self.cog.bot.get_guild(guild_id)
+                    settings = data.get("role_sync")
+
+                    if guild is not None and settings and managed_roles(settings):
+                        await self.sync_guild(guild, settings)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error while syncing roles.")
+
+            await asyncio.sleep(self.INTERVAL)
@@ -0,0 +1,161 @@
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class RequestShed(Exception):
+    """Raised when background work is dropped to leave room for commands."""
+
+
+class Ticket:
+    __slots__ = ("priority", "future")
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self.future: Optional[asyncio.Future] = None
+
+
+class PriorityScheduler:
+    """Hands out a limited number of request slots, commands first.
+
+    Interactive requests always get the next free slot before any background
+    request does. Background requests wait in line until ``background_room``
+    says the request budget has room for them, and are only shed when commands
+    are waiting for a slot or the background queue is full.
+    """
+
+    # How often deferred background requests check for room again
+    RECHECK = 0.1
+
+    def __init__(
+        self,
+        slots: int,
+        background_room: Callable[[], float] = lambda: math.inf,
+        max_background: int = 1000,
+    ):
+        self.slots = slots
+        self.background_room = background_room
+        self.max_background = max_background
+
+        self.active = 0
+        self.shed = 0
+        self.queues: Dict[Priority, deque] = {
+            priority: deque() for priority in Priority
+        }
+
+        self._recheck: Optional[asyncio.TimerHandle] = None
+
+    def waiting(self, priority: Optional[Priority] = None) -> int:
+        if priority is None:
+            return sum(len(queue) for queue in self.queues.values())
+
+        return len(self.queues[priority])
+
+    def set_slots(self, slots: int):
+        self.slots = slots
+        self._wake()
+
+    def promote(self, ticket: Ticket, priority: Priority = Priority.INTERACTIVE):
+        """Moves a ticket up, used when a command joins a background request."""
+
+        if ticket.priority <= priority:
+            return
+
+        queue = self.queues[ticket.priority]
+        ticket.priority = priority
+
+        if ticket in queue:
+            queue.remove(ticket)
+            self.queues[priority].append(ticket)
+
+    def _wake(self):
+        room = None
+
+        while self.active < self.slots:
+            for priority in Priority:
+                queue = self.queues[priority]
+
+                while queue and queue[0].future.done():
+                    queue.popleft()
+
+                if not queue:
+                    continue
+
+                if priority == Priority.BACKGROUND:
+                    # Checked once, the requests let through haven't used it yet
+                    room = self.background_room() if room is None else room
+
+                    if room < 1:
+                        self._defer()
+                        return
+
+                    room -= 1
+
+                self.active += 1
+                queue.popleft().future.set_result(None)
+                break
+            else:
+                return
+
+    def _defer(self):
+        if self._recheck is None:
+            self._recheck = asyncio.get_running_loop().call_later(
+                self.RECHECK, self._rechecked
+            )
+
+    def _rechecked(self):
+        self._recheck = None
+        self._wake()
+
+    async def acquire(self, ticket: Ticket):
+        if ticket.priority == Priority.BACKGROUND and (
+            self.waiting(Priority.INTERACTIVE)
+            or self.waiting(Priority.BACKGROUND) >= self.max_background
+        ):
+            self.shed += 1
+            raise RequestShed()
+
+        if (
+            self.active < self.slots
+            and not self.waiting()
+            and (ticket.priority == Priority.INTERACTIVE or self.background_room() >= 1)
+        ):
+            self.active += 1
+            return
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        self.queues[ticket.priority].append(ticket)
+
+        if ticket.priority == Priority.BACKGROUND:
+            self._wake()
+
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # We were handed a slot just as we got cancelled
+                self.release()
+            elif ticket in self.queues[ticket.priority]:
+                self.queues[ticket.priority].remove(ticket)
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, ticket: Ticket):
+        await self.acquire(ticket)
+
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import Payload
+
+logger = logging.getLogger("red.finger_cogs.clashofclans.store")
+
+
+class SnapshotStore:
+    """Keeps the latest payload of every endpoint in a local SQLite database.
+
+    Writes are queued and flushed in batches, and everything blocking runs in
+    an executor so the event loop is never held up by the disk. Payloads keep
+    their TTL and validators, so restored ones can be revalidated with a 304.
+    """
+
+    FLUSH_INTERVAL = 30
+    # Snapshots older than this are not loaded and get pruned
+    MAX_AGE = 86400
+    # Added since the first version, older databases get them when connecting
+    COLUMNS = ("ttl REAL", "etag TEXT", "last_modified TEXT", "digest TEXT")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pending: Dict[str, Payload] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path))
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots "
+            "(endpoint TEXT PRIMARY KEY, fetched_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+
+        existing = {
+            row[1] for row in connection.execute("PRAGMA table_info(snapshots)")
+        }
+
+        for column in self.COLUMNS:
+            if column.split()[0] not in existing:
+                connection.execute(f"ALTER TABLE snapshots ADD COLUMN {column}")
+
+        return connection
+
+    def queue(self, data: Payload):
+        # Kept as is, so validators set after queueing are saved too
+        self.pending[data.endpoint] = data
+
+    def _write(self, batch: List[Tuple]):
+        connection = self._connect()
+
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+                connection.execute(
+                    "DELETE FROM snapshots WHERE fetched_at < ?",
+                    (time.time() - self.MAX_AGE,),
+                )
+        finally:
+            connection.close()
+
+    def _read(self, limit: Optional[int]) -> List[Tuple]:
+        connection = self._connect()
+
+        try:
+            return connection.execute(
+                "SELECT endpoint, fetched_at, data, ttl, etag, last_modified, digest "
+                "FROM snapshots "
+                "WHERE fetched_at >= ? ORDER BY fetched_at DESC LIMIT ?",
+                (time.time() - self.MAX_AGE, -1 if limit is None else limit),
+            ).fetchall()
+        finally:
+            connection.close()
+
+    async def flush(self):
+        if not self.pending:
+            return
+
+        batch = [
+            (
+                endpoint,
+                data.fetched_at,
+                json.dumps(data),
+                data.ttl,
+                data.etag,
+                data.last_modified,
+                data.digest,
+            )
+            for endpoint, data in self.pending.items()
+        ]
+        self.pending = {}
+
+        await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+
+    async def load(self, limit: Optional[int] = None) -> List[Payload]:
+        """Returns the newest snapshots, oldest first so they can be replayed."""
+
+        rows = await asyncio.get_running_loop().run_in_executor(None, self._read, limit)
+        payloads = []
+
+        for endpoint, fetched_at, data, ttl, *validators in reversed(rows):
+            payload = Payload(json.loads(data), endpoint, fetched_at, ttl)
+            payload.etag, payload.last_modified, payload.digest = validators
+
+            payloads.append(payload)
+
+        return payloads
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Error while saving snapshots.")
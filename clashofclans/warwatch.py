@@ -0,0 +1,283 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import discord
+from redbot.core.utils.chat_formatting import pagify
+
+from .scheduler import Priority
+
+logger = logging.getLogger("red.finger_cogs.clashofclans.warwatch")
+
+WarKey = Tuple[Optional[str], Optional[str]]
+
+
+def war_key(data: Dict) -> WarKey:
+    """Tells wars apart, a clan only ever has one war starting at a time."""
+
+    return data.get("preparationStartTime"), data["opponent"].get("tag")
+
+
+def attack_count(data: Dict) -> int:
+    return data["clan"].get("attacks", 0) + data["opponent"].get("attacks", 0)
+
+
+class WarIndex:
+    """What has already been seen of one war.
+
+    Attacks are numbered by ``order`` across the whole war, so remembering the
+    last one seen is enough to find new attacks. The best stars against each
+    base are kept to work out how many stars an attack actually added.
+    """
+
+    __slots__ = ("key", "state", "attacks", "last_order", "best_stars")
+
+    def __init__(self, key: WarKey, state: str):
+        self.key = key
+        self.state = state
+        self.attacks = 0
+        self.last_order = 0
+        self.best_stars: Dict[str, int] = {}
+
+    def scan(self, data: Dict) -> List[Dict]:
+        """Indexes attacks made since the last scan and returns them in order."""
+
+        names = {}
+        new_attacks = []
+
+        for side in ("clan", "opponent"):
+            for member in data[side].get("members", []):
+                names[member["tag"]] = member["name"]
+
+                for attack in member.get("attacks", []):
+                    if attack["order"] > self.last_order:
+                        new_attacks.append((side, attack))
+
+        events = []
+
+        for side, attack in sorted(new_attacks, key=lambda item: item[1]["order"]):
+            defender = attack["defenderTag"]
+            best = self.best_stars.get(defender, 0)
+
+            self.best_stars[defender] = max(best, attack["stars"])
+            self.last_order = attack["order"]
+
+            events.append(
+                {
+                    "type": "attack",
+                    "side": side,
+                    "attacker": names.get(attack["attackerTag"], attack["attackerTag"]),
+                    "defender": names.get(defender, defender),
+                    "stars": attack["stars"],
+                    "new_stars": max(0, attack["stars"] - best),
+                    "destruction": attack["destructionPercentage"],
+                }
+            )
+
+        self.attacks = attack_count(data)
+
+        return events
+
+
+def diff_war(
+    index: Optional[WarIndex], data: Dict
+) -> Tuple[Optional[WarIndex], List[Dict]]:
+    """Compares a war to what was seen of it before and returns what changed.
+
+    The first time a clan is seen nothing is reported, its war is only
+    indexed so that restarting the bot doesn't repost a whole war.
+    """
+
+    state = data["state"]
+
+    if state == "notInWar":
+        return index, []
+
+    key = war_key(data)
+
+    if index is None:
+        index = WarIndex(key, state)
+        index.scan(data)
+        return index, []
+
+    events = []
+
+    if index.key != key:
+        index = WarIndex(key, None)
+
+    # Most polls have no new attacks, so members are only read when there are
+    if attack_count(data) != index.attacks:
+        attacks = index.scan(data)
+
+        if attacks:
+            events += attacks
+            events.append({"type": "score"})
+
+    if state != index.state:
+        change = {"type": "state", "state": state}
+
+        # The last attacks of a war happened before it ended
+        if state == "warEnded":
+            events.append(change)
+        else:
+            events.insert(0, change)
+
+        index.state = state
+
+    return index, events
+
+
+def war_result(data: Dict) -> str:
+    ours = (data["clan"]["stars"], data["clan"]["destructionPercentage"])
+    theirs = (data["opponent"]["stars"], data["opponent"]["destructionPercentage"])
+
+    if ours > theirs:
+        return "Victory"
+    elif ours < theirs:
+        return "Defeat"
+
+    return "Tie"
+
+
+def format_event(data: Dict, event: Dict) -> str:
+    clan = data["clan"]
+    opponent = data["opponent"]
+
+    if event["type"] == "state":
+        if event["state"] == "preparation":
+            return f"Preparation day has started against **{opponent['name']}**."
+        elif event["state"] == "inWar":
+            return f"Battle day has started against **{opponent['name']}**!"
+        elif event["state"] == "warEnded":
+            return f"The war against **{opponent['name']}** has ended: **{war_result(data)}**."
+
+        return f"The war against **{opponent['name']}** is now {event['state']}."
+
+    if event["type"] == "score":
+        return f"**Score** {clan['stars']} ⭐ {clan['destructionPercentage']:.2f}% - {opponent['stars']} ⭐ {opponent['destructionPercentage']:.2f}%"
+
+    stars = "★" * event["stars"] + "☆" * (3 - event["stars"])
+    new_stars = f" (+{event['new_stars']})" if event["new_stars"] else ""
+
+    return f"{'⚔️' if event['side'] == 'clan' else '🛡️'} **{event['attacker']}** attacked **{event['defender']}** {stars} {event['destruction']}%{new_stars}"
+
+
+class WarWatcher:
+    """Polls the current war of watched clans and posts what changed.
+
+    Clans are polled at background priority, however many channels watch
+    them, and only new events are rendered and sent. A tick polls no more
+    clans than the API tokens can serve, so with many watched clans they take
+    turns, and polls that didn't go through are retried first.
+    """
+
+    # Matches how long current wars are cached for
+    TICK = 30
+    # Part of the request budget war polls may use, the rest is left to other work
+    SHARE = 0.5
+
+    def __init__(self, cog):
+        self.cog = cog
+
+        self.channels: Dict[str, Set[int]] = defaultdict(set)
+        self.wars: Dict[str, WarIndex] = {}
+
+        self.offset = 0
+        self.retry: List[str] = []
+
+    def load(self, guilds: Dict[int, Dict]):
+        for data in guilds.values():
+            for tag, channel_id in data.get("war_watch", {}).items():
+                self.channels[tag].add(channel_id)
+
+    def watch(self, tag: str, channel_id: int):
+        self.channels[tag].add(channel_id)
+
+    def unwatch(self, tag: str, channel_id: int):
+        channels = self.channels.get(tag, set())
+        channels.discard(channel_id)
+
+        if not channels:
+            self.channels.pop(tag, None)
+            self.wars.pop(tag, None)
+
+    def per_tick(self) -> int:
+        rate = sum(key.bucket.rate for key in self.cog.keys.keys)
+
+        return max(1, int(rate * self.TICK * self.SHARE))
+
+    def due(self) -> List[str]:
+        """The clans to poll this tick, retries first and then the next in turn."""
+
+        limit = self.per_tick()
+
+        retry = [tag for tag in dict.fromkeys(self.retry) if tag in self.channels]
+        due, self.retry = retry[:limit], retry[limit:]
+
+        rest = [tag for tag in self.channels if tag not in due]
+        count = min(limit - len(due), len(rest))
+        start = self.offset % len(rest) if rest else 0
+
+        due += (rest[start:] + rest[:start])[:count]
+        self.offset = start + count
+
+        return due
+
+    async def tick(self):
+        tags = self.due()
+
+        results = await self.cog.fetch_many(
+            (f"clans/%23{tag}/currentwar" for tag in tags), Priority.BACKGROUND
+        )
+
+        for tag, data in zip(tags, results):
+            if not data:
+                # Dropped or failed, which says nothing about the war
+                self.retry.append(tag)
+                continue
+
+            if data == 404:
+                continue
+
+            index, events = diff_war(self.wars.get(tag), data)
+
+            if index is not None:
+                self.wars[tag] = index
+
+            if events and tag in self.channels:
+                await self.post(tag, data, events)
+
+    async def post(self, tag: str, data: Dict, events: List[Dict]):
+        text = (
+            f"__**{data['clan']['name']} vs {data['opponent']['name']}**__\n"
+            + "\n".join(format_event(data, event) for event in events)
+        )
+
+        for channel_id in list(self.channels.get(tag, ())):
+            channel = self.cog.bot.get_channel(channel_id)
+
+            if channel is None:
+                continue
+
+            try:
+                for page in pagify(text):
+                    await channel.send(page)
+            except discord.HTTPException:
+                logger.warning(
+                    "Could not post war updates for #%s in %s.", tag, channel_id
+                )
+
+    async def run(self):
+        await self.cog.bot.wait_until_ready()
+
+        while True:
+            try:
+                if self.channels:
+                    await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error while watching wars.")
+
+            await asyncio.sleep(self.TICK)
@@ -0,0 +1,19 @@
+import asyncio
+
+from benchmarks import bench_commands
+
+
+def test_all_scenarios_run():
+    args = bench_commands.make_parser().parse_args(
+        ["--invocations", "3", "--concurrency", "3", "--latency", "0"]
+    )
+
+    # Any exception raised by a command fails the run
+    results = asyncio.run(bench_commands.run(args))
+
+    assert set(results) == set(bench_commands.SCENARIOS)
+
+    for result in results.values():
+        assert result["invocations"] == 3
+        assert result["failures"] == 0
+        assert result["api_requests"] > 0
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from clashofclans import breaker
+from clashofclans.breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(breaker, "time", SimpleNamespace(monotonic=lambda: now[0]))
+
+    return now
+
+
+def test_opens_after_failures_in_a_row(clock):
+    circuit = CircuitBreaker(threshold=3, reset_timeout=30)
+
+    for healthy in (False, False, True, False, False):
+        assert circuit.allow()
+        circuit.record(healthy)
+
+    # A success in between starts the count over
+    assert circuit.state == CircuitBreaker.CLOSED
+
+    circuit.record(False)
+
+    assert circuit.state == CircuitBreaker.OPEN
+    assert not circuit.allow()
+
+
+def test_single_probe_when_half_open(clock):
+    circuit = CircuitBreaker(threshold=1, reset_timeout=30)
+    circuit.record(False)
+
+    clock[0] = 29
+    assert not circuit.allow()
+
+    clock[0] = 30
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+    assert circuit.allow()
+    assert not circuit.allow()
+
+    # A failed probe waits a whole timeout again
+    circuit.record(False)
+    assert circuit.state == CircuitBreaker.OPEN
+
+    clock[0] = 59
+    assert not circuit.allow()
+
+    clock[0] = 60
+    assert circuit.allow()
+
+    circuit.record(True)
+    assert circuit.state == CircuitBreaker.CLOSED
+    assert circuit.allow() and circuit.allow()
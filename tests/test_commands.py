@@ -0,0 +1,97 @@
+import asyncio
+
+from benchmarks import bench_commands, fakes
+from benchmarks.mock_api import MockClashAPI
+from clashofclans.cache import DEFAULT_TTLS, ResponseCache, endpoint_family
+
+
+def run_command(tmp_path, name, *args, reactions=(), author=None, guild=None, **kwargs):
+    """Invokes a command against the mock API and returns what it showed."""
+
+    async def main():
+        api = MockClashAPI(latency=0, jitter=0, seed=0)
+        cog, bot = await bench_commands.make_cog(await api.start(), tmp_path)
+        bot.reactions = list(reactions)
+
+        ctx = fakes.FakeContext(bot, cog, author)
+        ctx.guild = guild
+        cog.links.link_clan(ctx.author.id, bench_commands.CLAN_TAG)
+
+        try:
+            await asyncio.wait_for(
+                getattr(cog, name).callback(cog, ctx, *args, **kwargs), timeout=10
+            )
+        finally:
+            cog.cog_unload()
+            await asyncio.sleep(0)
+            await api.stop()
+
+        return [embed for message in ctx.sent for embed in message.shown]
+
+    return asyncio.run(main())
+
+
+def test_search_pages(tmp_path):
+    # The mock has 35 matches, so four pages and back to the first
+    shown = run_command(tmp_path, "search", "war", reactions=["➡️"] * 4)
+
+    assert [embed.footer.text for embed in shown] == [
+        "Page 1 of many",
+        "Page 2 of many",
+        "Page 3 of many",
+        "Page 4",
+        "Page 1 of many",
+    ]
+    assert "war 30" in shown[3].description
+
+
+def test_search_no_matches(tmp_path):
+    shown = run_command(tmp_path, "search", "war", 51, reactions=["➡️"])
+
+    assert [embed.description for embed in shown] == ["No clans were found."] * 2
+
+
+def test_search_location(tmp_path):
+    shown = run_command(tmp_path, "search", "war", location="Germany")
+
+    assert shown[0].author.name == "Clans matching war"
+
+    shown = run_command(tmp_path, "search", "war", location="Atlantis")
+
+    assert shown == [None]
+
+
+def test_locations_ttl():
+    cache = ResponseCache()
+
+    assert endpoint_family("locations?limit=1000") == "locations"
+    assert cache.ttl("locations?limit=1000") == DEFAULT_TTLS["locations"]
+    assert endpoint_family("clans?name=war") == "search"
+
+
+def test_leaderboard_pages(tmp_path):
+    # The mock's clans are full, so five pages and back to the first
+    shown = run_command(tmp_path, "leaderboard", reactions=["➡️"] * 5 + ["⬅️"])
+
+    assert [embed.footer.text for embed in shown] == [
+        *(f"Page {page} of 5" for page in (1, 2, 3, 4, 5, 1)),
+        "Page 5 of 5",
+    ]
+    assert shown[1].description.startswith("```11")
+
+
+def test_guild_leaderboard_pages(tmp_path):
+    author = fakes.FakeUser()
+    guild = fakes.FakeGuild([author])
+
+    shown = run_command(
+        tmp_path,
+        "guildleaderboard",
+        "donations",
+        reactions=["⬅️"],
+        author=author,
+        guild=guild,
+    )
+
+    assert [embed.footer.text for embed in shown] == ["Page 1 of 5", "Page 5 of 5"]
+    assert shown[0].author.name == "Benchmark by donations"
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from redbot.core import commands
+
+from benchmarks import bench_commands, fakes
+from clashofclans.converters import TagConverter, UnlinkTagConverter
+
+
+def convert(tmp_path, command, arg):
+    async def main():
+        cog, bot = await bench_commands.make_cog("http://127.0.0.1/v1/", tmp_path)
+
+        ctx = fakes.FakeContext(bot, cog)
+        ctx.command = getattr(cog, command)
+        cog.links.link(ctx.author.id, "2PPM00")
+        cog.links.link_clan(ctx.author.id, bench_commands.CLAN_TAG)
+
+        try:
+            return await UnlinkTagConverter().convert(ctx, arg)
+        finally:
+            cog.cog_unload()
+            await asyncio.sleep(0)
+
+    return asyncio.run(main())
+
+
+def test_unlink_clan(tmp_path):
+    assert convert(tmp_path, "unlinkclan", "#2PP") == "2PP"
+
+    with pytest.raises(commands.BadArgument, match="this clan"):
+        convert(tmp_path, "unlinkclan", "2PPM00")
+
+
+def test_unlink_account(tmp_path):
+    assert convert(tmp_path, "unlink", "#2PPM00") == "2PPM00"
+
+    with pytest.raises(commands.BadArgument, match="this account"):
+        convert(tmp_path, "unlink", "2PP")
+
+
+def test_tags():
+    convert = TagConverter().convert
+
+    assert asyncio.run(convert(None, "#2ppy")) == "2PPY"
+
+    # Days and metrics that follow an optional tag
+    for arg in ("14", "donations", "#"):
+        with pytest.raises(commands.BadArgument):
+            asyncio.run(convert(None, arg))
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from clashofclans.cache import Payload
+from clashofclans.history import History, MemberSeries
+
+DAY = 86400
+
+
+def series(*points):
+    """A member series from (timestamp, donations) points."""
+
+    member = MemberSeries("Member", "2PP")
+
+    for timestamp, donations in points:
+        member.append(
+            timestamp,
+            {"donations": donations, "donationsReceived": 0, "trophies": 5000},
+        )
+
+    return member
+
+
+def test_donations_across_a_season_reset():
+    member = series((1000, 100), (2000, 150), (3000, 20), (4000, 50))
+
+    # 50 before the reset, then 20 and 30 in the new season
+    assert member.increase("donations", 0) == 100
+    assert member.increase("donations", member.since(2500)) == 30
+
+
+def test_downsampling_keeps_the_point_before_a_reset():
+    now = 100 * DAY
+    start = now - 10 * DAY
+    member = series(
+        (start, 100),
+        (start + 100, 200),
+        (start + 200, 10),
+        (start + 300, 30),
+        (now - 100, 40),
+    )
+
+    member.downsample(now, History.TIERS, History.MAX_AGE)
+
+    # One point per day this far back, except the last one of the season
+    assert list(member.times) == [start + 100, start + 300, now - 100]
+    assert member.increase("donations", 0) == 40
+
+
+def test_downsampling_drops_points_past_max_age():
+    now = 100 * DAY
+    member = series((now - 50 * DAY, 10), (now - 100, 20))
+
+    member.downsample(now, History.TIERS, History.MAX_AGE)
+
+    assert list(member.times) == [now - 100]
+
+
+def test_snapshots_are_retried_and_recorded(tmp_path):
+    clan = {"memberList": [{"tag": "#M1", "name": "Member", "donations": 10}]}
+    responses = [[False], [Payload(clan, "clans/%232PP", time.time(), None)]]
+
+    async def fetch_many(endpoints, priority):
+        list(endpoints)
+        return responses.pop(0)
+
+    cog = SimpleNamespace(
+        fetch_many=fetch_many, links=SimpleNamespace(clan_users={"2PP": {1}})
+    )
+    history = History(cog, tmp_path / "history.sqlite3")
+
+    asyncio.run(history.tick())
+
+    assert history.last_snapshot == {}
+
+    # Served from the cache, so observe never saw it
+    asyncio.run(history.tick())
+
+    assert "2PP" in history.last_snapshot
+    assert history.top_donors("2PP", 0) == [("Member", 0, 0)]
+    assert len(history.members["M1"]) == 1
@@ -0,0 +1,81 @@
+import asyncio
+
+import discord
+
+from benchmarks.fakes import FakeBot, FakeContext
+from clashofclans.menus import LazyPages, StreamPages, lazy_menu
+
+
+def run(pages, reactions):
+    """Drives ``lazy_menu`` through Red's ``menu`` and returns what was shown."""
+
+    async def main():
+        ctx = FakeContext(FakeBot(reactions), None)
+        await asyncio.wait_for(lazy_menu(ctx, pages(), timeout=1), 5)
+        return [embed.description for embed in ctx.sent[0].shown]
+
+    return asyncio.run(main())
+
+
+async def stream(count):
+    for item in range(count):
+        yield item
+
+
+def stream_pages(count):
+    def render(index, items, last):
+        return discord.Embed(description=" ".join(map(str, items)) or "No results")
+
+    return StreamPages(stream(count), 10, render)
+
+
+def test_lazy_pages_wrap_around():
+    async def render(index):
+        return discord.Embed(description=f"page {index}")
+
+    shown = run(lambda: LazyPages(3, render), ["➡️", "➡️", "➡️", "⬅️"])
+
+    assert shown == ["page 0", "page 1", "page 2", "page 0", "page 2"]
+
+
+def test_lazy_pages_render_on_demand():
+    rendered = set()
+
+    async def render(index):
+        rendered.add(index)
+        return discord.Embed(description=f"page {index}")
+
+    shown = run(lambda: LazyPages(50, render), ["➡️"])
+
+    assert shown == ["page 0", "page 1"]
+    assert rendered <= {0, 1, 2}
+
+
+def test_stream_pages():
+    shown = run(lambda: stream_pages(25), ["➡️", "➡️", "➡️"])
+
+    assert shown == [
+        " ".join(map(str, range(0, 10))),
+        " ".join(map(str, range(10, 20))),
+        " ".join(map(str, range(20, 25))),
+        " ".join(map(str, range(0, 10))),
+    ]
+
+
+def test_stream_single_page():
+    shown = run(lambda: stream_pages(3), ["➡️", "⬅️"])
+
+    assert shown == ["0 1 2"] * 3
+
+
+def test_stream_empty():
+    shown = run(lambda: stream_pages(0), ["➡️"])
+
+    assert shown == ["No results"] * 2
+
+
+def test_stream_last_page_full():
+    # Whether there is another page is only known after pulling past this one
+    shown = run(lambda: stream_pages(10), ["➡️", "➡️"])
+
+    assert shown == [" ".join(map(str, range(10)))] * 3
@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+from clashofclans import ratelimit
+from clashofclans.ratelimit import TokenBucket
+
+
+def test_slow_rates_keep_their_rate(monkeypatch):
+    now = [0.0]
+
+    async def sleep(delay):
+        now[0] += delay
+
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(
+        ratelimit, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=sleep)
+    )
+
+    async def main():
+        bucket = TokenBucket(0.5)
+
+        for _ in range(3):
+            await bucket.acquire()
+
+        return bucket
+
+    bucket = asyncio.run(main())
+
+    # The first token is there from the start, then one every two seconds
+    assert bucket.capacity == 1
+    assert now[0] == 4.0
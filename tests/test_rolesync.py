@@ -0,0 +1,109 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from clashofclans.cache import ResponseCache
+from clashofclans.rolesync import RoleSync
+from clashofclans.scheduler import Priority
+
+
+def test_payloads_refetch_old_entries():
+    fetched = []
+
+    async def fetch_many(endpoints, priority):
+        endpoints = list(endpoints)
+        fetched.append((sorted(endpoints), priority))
+        return [{"tag": endpoint} for endpoint in endpoints]
+
+    cache = ResponseCache()
+    cache.set("players/%23FRESH", {"tag": "fresh"})
+    cache.set("players/%23OLD", {"tag": "old"}, time.time() - RoleSync.MAX_AGE - 1)
+
+    sync = RoleSync(SimpleNamespace(cache=cache, fetch_many=fetch_many, keys=[]))
+    payloads = asyncio.run(
+        sync.payloads(["players/%23FRESH", "players/%23OLD", "players/%23NEW"])
+    )
+
+    assert fetched == [(["players/%23NEW", "players/%23OLD"], Priority.BACKGROUND)]
+    assert payloads["players/%23FRESH"] == {"tag": "fresh"}
+    assert payloads["players/%23OLD"] == {"tag": "players/%23OLD"}
+
+
+class Role:
+    def __init__(self, position):
+        self.id = position
+        self.position = position
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+
+class Member:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.bot = False
+        self.roles = []
+
+    async def add_roles(self, *roles, reason=None):
+        self.roles += roles
+
+    async def remove_roles(self, *roles, reason=None):
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+def test_batches_wait_for_tokens():
+    tokens = [10]
+    chunks = []
+
+    def background_room():
+        # Every check finds a few more tokens, like a bucket refilling
+        tokens[0] = min(10, tokens[0] + 3)
+        return tokens[0]
+
+    async def fetch_many(endpoints, priority):
+        endpoints = list(endpoints)
+        chunks.append(len(endpoints))
+
+        # Requests past what the bucket holds get dropped
+        results = [
+            {"tag": endpoint[-4:], "townHallLevel": 14} if index < tokens[0] else False
+            for index, endpoint in enumerate(endpoints)
+        ]
+        tokens[0] = max(0, tokens[0] - len(endpoints))
+
+        return results
+
+    members = {user_id: Member(user_id) for user_id in range(1000, 1060)}
+    townhall = Role(1)
+
+    links = SimpleNamespace(
+        ready=asyncio.Event(),
+        accounts={user_id: [f"P{user_id}"] for user_id in members},
+        clans={},
+    )
+    links.ready.set()
+
+    cog = SimpleNamespace(
+        cache=ResponseCache(),
+        keys=[object()],
+        links=links,
+        background_room=background_room,
+        fetch_many=fetch_many,
+    )
+    guild = SimpleNamespace(
+        id=1,
+        me=SimpleNamespace(top_role=Role(10)),
+        get_role=lambda role_id: townhall if role_id == townhall.id else None,
+        get_member=members.get,
+    )
+
+    sync = RoleSync(cog)
+    sync.FETCH_DELAY = 0
+    sync.EDITS_PER_BATCH = 1000
+
+    settings = {"clan": {}, "townhall": {"14": townhall.id}, "rank": {}}
+    stats = asyncio.run(sync.sync_guild(guild, settings))
+
+    assert stats["skipped"] == 0
+    assert stats["added"] == len(members)
+    assert max(chunks) <= 10
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from benchmarks import bench_commands
+from benchmarks.mock_api import MockClashAPI
+from clashofclans import scheduler as scheduling
+from clashofclans.scheduler import Priority, PriorityScheduler, Ticket
+
+
+def start(scheduler, priority, order):
+    async def acquire():
+        await scheduler.acquire(ticket)
+        order.append(ticket)
+
+    ticket = Ticket(priority)
+
+    return ticket, asyncio.ensure_future(acquire())
+
+
+def test_commands_go_first():
+    async def main():
+        scheduler = PriorityScheduler(1)
+        order = []
+
+        await scheduler.acquire(Ticket(Priority.INTERACTIVE))
+
+        _, background = start(scheduler, Priority.BACKGROUND, [])
+        await asyncio.sleep(0)
+        interactive, _ = start(scheduler, Priority.INTERACTIVE, order)
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        await asyncio.sleep(0)
+
+        assert order == [interactive]
+        assert not background.done()
+
+        background.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_background_waits_for_room():
+    async def main():
+        tokens = [0]
+        order = []
+        # Every request that got through used up a token
+        scheduler = PriorityScheduler(10, lambda: tokens[0] - len(order))
+        scheduler.RECHECK = 0.01
+
+        tickets = [start(scheduler, Priority.BACKGROUND, order)[0] for _ in range(5)]
+        await asyncio.sleep(0.05)
+
+        assert order == []
+        assert scheduler.shed == 0
+
+        tokens[0] = 2
+        await asyncio.sleep(0.05)
+
+        # Deferred rather than shed, and let through in order
+        assert order == tickets[:2]
+
+        tokens[0] = 10
+        await asyncio.sleep(0.05)
+
+        assert order == tickets
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_background_shed_when_commands_wait():
+    async def main():
+        scheduler = PriorityScheduler(1)
+
+        await scheduler.acquire(Ticket(Priority.INTERACTIVE))
+        _, waiting = start(scheduler, Priority.INTERACTIVE, [])
+        await asyncio.sleep(0)
+
+        with pytest.raises(scheduling.RequestShed):
+            await scheduler.acquire(Ticket(Priority.BACKGROUND))
+
+        assert scheduler.shed == 1
+
+        waiting.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_background_shed_when_queue_full():
+    async def main():
+        scheduler = PriorityScheduler(10, lambda: 0, max_background=2)
+
+        queued = [start(scheduler, Priority.BACKGROUND, [])[1] for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(scheduling.RequestShed):
+            await scheduler.acquire(Ticket(Priority.BACKGROUND))
+
+        for task in queued:
+            task.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_promote_and_cancel():
+    async def main():
+        scheduler = PriorityScheduler(1)
+        order = []
+
+        await scheduler.acquire(Ticket(Priority.INTERACTIVE))
+
+        first, _ = start(scheduler, Priority.BACKGROUND, order)
+        promoted, _ = start(scheduler, Priority.BACKGROUND, order)
+        _, cancelled = start(scheduler, Priority.INTERACTIVE, order)
+        await asyncio.sleep(0)
+
+        scheduler.promote(promoted)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        assert scheduler.waiting(Priority.INTERACTIVE) == 1
+
+        scheduler.release()
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.sleep(0)
+
+        assert order == [promoted, first]
+        assert scheduler.active == 1
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_background_fetches_all_get_through(tmp_path):
+    async def main():
+        api = MockClashAPI(latency=0, jitter=0, seed=0)
+        cog, bot = await bench_commands.make_cog(await api.start(), tmp_path)
+        cog.keys.set_rate(10)
+
+        try:
+            return await cog.fetch_many(
+                (f"players/%23BG{index:02}" for index in range(30)),
+                Priority.BACKGROUND,
+            )
+        finally:
+            cog.cog_unload()
+            await asyncio.sleep(0)
+            await api.stop()
+
+    results = asyncio.run(asyncio.wait_for(main(), 30))
+
+    assert all(results)
@@ -0,0 +1,60 @@
+import asyncio
+import math
+import sqlite3
+import time
+
+from clashofclans.cache import Payload, ResponseCache
+from clashofclans.store import SnapshotStore
+
+
+def test_restored_payloads_can_be_revalidated(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite3")
+
+    data = Payload({"state": "warEnded"}, "clanwarleagues/wars/%23W", time.time())
+    store.queue(data)
+
+    # Validators are only set once the payload is cached, after queueing
+    data.ttl = math.inf
+    data.etag = '"abc"'
+    data.last_modified = "Sat, 17 Oct 2026 08:00:00 GMT"
+    data.digest = "d" * 32
+
+    async def main():
+        await store.flush()
+        return await store.load()
+
+    (restored,) = asyncio.run(main())
+
+    cache = ResponseCache()
+    cache.restore(restored)
+
+    assert restored == data
+    assert restored.ttl == math.inf
+    assert restored.digest == data.digest
+    assert cache.get(data.endpoint) is restored
+    assert cache.peek(data.endpoint).validators() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Sat, 17 Oct 2026 08:00:00 GMT",
+    }
+
+
+def test_databases_without_validators_still_load(tmp_path):
+    path = tmp_path / "snapshots.sqlite3"
+
+    connection = sqlite3.connect(str(path))
+    with connection:
+        connection.execute(
+            "CREATE TABLE snapshots "
+            "(endpoint TEXT PRIMARY KEY, fetched_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO snapshots VALUES (?, ?, ?)",
+            ("players/%23P", time.time(), '{"tag": "#P"}'),
+        )
+    connection.close()
+
+    (restored,) = asyncio.run(SnapshotStore(path).load())
+
+    assert restored == {"tag": "#P"}
+    assert restored.ttl is None
+    assert restored.validators() == {}
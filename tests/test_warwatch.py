@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+from clashofclans.warwatch import WarWatcher, diff_war
+
+
+def war(*attacks, state="inWar", start="20261017T000000.000Z"):
+    """A war between #A and #B, attacks are (side, attacker, defender, stars)."""
+
+    sides = {
+        side: {
+            "tag": f"#{side[0].upper()}",
+            "name": side,
+            "stars": 0,
+            "destructionPercentage": 0.0,
+            "attacks": 0,
+            "members": [],
+        }
+        for side in ("clan", "opponent")
+    }
+
+    for order, (side, attacker, defender, stars) in enumerate(attacks, start=1):
+        sides[side]["attacks"] += 1
+        sides[side]["members"].append(
+            {
+                "tag": attacker,
+                "name": attacker,
+                "attacks": [
+                    {
+                        "attackerTag": attacker,
+                        "defenderTag": defender,
+                        "stars": stars,
+                        "destructionPercentage": 50,
+                        "order": order,
+                    }
+                ],
+            }
+        )
+
+    return {"state": state, "preparationStartTime": start, **sides}
+
+
+def test_first_poll_posts_nothing():
+    index, events = diff_war(None, war(("clan", "#A1", "#B1", 2)))
+
+    assert events == []
+    assert index.last_order == 1
+
+    index, events = diff_war(index, war(("clan", "#A1", "#B1", 2)))
+
+    assert events == []
+
+
+def test_new_stars_count_only_improvements():
+    index, _ = diff_war(None, war(("clan", "#A1", "#B1", 2)))
+
+    index, events = diff_war(
+        index,
+        war(
+            ("clan", "#A1", "#B1", 2),
+            ("clan", "#A2", "#B1", 3),
+            ("clan", "#A3", "#B1", 1),
+        ),
+    )
+
+    attacks = [event for event in events if event["type"] == "attack"]
+
+    assert [(event["attacker"], event["new_stars"]) for event in attacks] == [
+        ("#A2", 1),
+        ("#A3", 0),
+    ]
+    assert events[-1] == {"type": "score"}
+
+
+def test_state_changes():
+    index, _ = diff_war(None, war(state="preparation"))
+
+    index, events = diff_war(index, war(("clan", "#A1", "#B1", 3), state="warEnded"))
+
+    # The last attacks happened before the war ended
+    assert [event["type"] for event in events] == ["attack", "score", "state"]
+
+    # A new war starts over, without reposting old attacks
+    index, events = diff_war(index, war(("clan", "#A1", "#B1", 1), start="next"))
+
+    assert [event["type"] for event in events] == ["state", "attack", "score"]
+    assert events[1]["new_stars"] == 1
+
+
+def watcher(tags, fetch):
+    polled = []
+
+    async def fetch_many(endpoints, priority):
+        endpoints = list(endpoints)
+        polled.append([endpoint.split("/")[1][3:] for endpoint in endpoints])
+        return [fetch(endpoint) for endpoint in endpoints]
+
+    cog = SimpleNamespace(
+        fetch_many=fetch_many,
+        keys=SimpleNamespace(keys=[SimpleNamespace(bucket=SimpleNamespace(rate=1))]),
+    )
+
+    watch = WarWatcher(cog)
+    watch.SHARE = 10 / watch.TICK
+
+    for tag in tags:
+        watch.watch(tag, 1)
+
+    return watch, polled
+
+
+def test_clans_take_turns():
+    tags = [f"C{index:03}" for index in range(25)]
+    watch, polled = watcher(tags, lambda endpoint: {"state": "notInWar"})
+
+    for _ in range(3):
+        asyncio.run(watch.tick())
+
+    assert [len(tick) for tick in polled] == [10, 10, 10]
+    assert set(tags) <= {tag for tick in polled for tag in tick}
+
+
+def test_dropped_polls_go_first():
+    tags = [f"C{index:03}" for index in range(20)]
+    dropped = {"C003", "C007"}
+
+    def fetch(endpoint):
+        return False if endpoint.split("/")[1][3:] in dropped else {"state": "notInWar"}
+
+    watch, polled = watcher(tags, fetch)
+
+    asyncio.run(watch.tick())
+    dropped.clear()
+    asyncio.run(watch.tick())
+
+    assert polled[1][:2] == ["C003", "C007"]
+    assert watch.retry == []